@@ -0,0 +1,57 @@
+_tables = {}
+
+
+class FrameTable:
+    """Frame names and sequences for one sprite, shared by every instance.
+
+    Frames are numbered in the order they are first used; each sequence is a
+    tuple of those numbers. A left-facing sequence with no frames of its own
+    reuses the right-facing images with `flips` set, so renderers can mirror
+    them once instead of on every draw.
+    """
+
+    def __init__(self, sprite_prefix, num_idle_right_frames, num_idle_left_frames,
+                 num_run_right_frames, num_run_left_frames, num_jump_right_frames, num_jump_left_frames):
+        self.key = (sprite_prefix, num_idle_right_frames, num_idle_left_frames, num_run_right_frames,
+                    num_run_left_frames, num_jump_right_frames, num_jump_left_frames)
+        self.names = []
+        self.flips = []
+        self._indexes = {}
+
+        self.idle_right, self.idle_left = self._add_pair(
+            sprite_prefix, "idle", num_idle_right_frames, num_idle_left_frames)
+        self.run_right, self.run_left = self._add_pair(
+            sprite_prefix, "run", num_run_right_frames, num_run_left_frames)
+        self.jump_right, self.jump_left = self._add_pair(
+            sprite_prefix, "jump", num_jump_right_frames, num_jump_left_frames)
+
+        self.names = tuple(self.names)
+        self.flips = tuple(self.flips)
+
+    def _add(self, name, flip):
+        index = self._indexes.get((name, flip))
+        if index is None:
+            index = self._indexes[(name, flip)] = len(self.names)
+            self.names.append(name)
+            self.flips.append(flip)
+        return index
+
+    def _add_pair(self, sprite_prefix, action, num_right_frames, num_left_frames):
+        right = tuple(self._add(f"sprites/{action}/{sprite_prefix}_{action}_right_{i}", False)
+                      for i in range(1, num_right_frames + 1))
+        if num_left_frames:
+            left = tuple(self._add(f"sprites/{action}/{sprite_prefix}_{action}_left_{i}", False)
+                         for i in range(1, num_left_frames + 1))
+        else:
+            left = tuple(self._add(self.names[index], True) for index in right)
+        return right, left
+
+
+def frame_table(sprite_prefix, num_idle_right_frames, num_idle_left_frames,
+                num_run_right_frames, num_run_left_frames, num_jump_right_frames=0, num_jump_left_frames=0):
+    key = (sprite_prefix, num_idle_right_frames, num_idle_left_frames, num_run_right_frames,
+           num_run_left_frames, num_jump_right_frames, num_jump_left_frames)
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = FrameTable(*key)
+    return table
@@ -0,0 +1,106 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .settings import ROOT
+
+ASSET_DIRS = {
+    "image": ("images", (".png", ".gif", ".jpg", ".jpeg", ".bmp")),
+    "sound": ("sounds", (".wav", ".ogg", ".oga")),
+    "music": ("music", (".ogg", ".oga", ".mp3", ".wav")),
+    "level": ("levels", (".json",)),
+}
+
+
+class Asset:
+    def __init__(self, kind, name, path):
+        self.kind = kind
+        self.name = name
+        self.path = path
+        self.decode_time = 0.0
+        self.install_time = 0.0
+
+    def __repr__(self):
+        return f"Asset({self.kind!r}, {self.name!r})"
+
+
+def build_manifest(root=ROOT):
+    """Every asset the game ships, as `Asset`s named the way pgzero loads them."""
+    manifest = []
+    for kind, (directory, extensions) in ASSET_DIRS.items():
+        base = os.path.join(root, directory)
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith(("_", ".")))
+            for filename in sorted(filenames):
+                stem, extension = os.path.splitext(filename)
+                if extension.lower() not in extensions:
+                    continue
+                relative = os.path.relpath(os.path.join(dirpath, stem), base).replace(os.sep, "/")
+                manifest.append(Asset(kind, relative, os.path.join(dirpath, filename)))
+    return manifest
+
+
+class AssetPreloader:
+    """Decodes the manifest on a thread pool while the game shows a loading screen.
+
+    Decoding (the expensive, GIL-releasing part) happens on worker threads;
+    `poll` installs finished assets into the backend's caches on the main
+    thread, within a per-frame time budget so the loading screen stays live.
+    """
+
+    def __init__(self, backend, manifest=None, workers=4, verbose=False):
+        self.backend = backend
+        self.manifest = build_manifest() if manifest is None else manifest
+        self.verbose = verbose
+        self.started = time.perf_counter()
+        self.finished = None
+        self.installed = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="setorzero-assets")
+        self.pending = [(asset, self.executor.submit(self._decode, asset)) for asset in self.manifest]
+
+    def _decode(self, asset):
+        start = time.perf_counter()
+        data = self.backend.decode_asset(asset)
+        asset.decode_time = time.perf_counter() - start
+        return data
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    @property
+    def progress(self):
+        return self.installed / len(self.manifest) if self.manifest else 1.0
+
+    def poll(self, budget=0.004):
+        """Install decoded assets for up to `budget` seconds; return True once all are in."""
+        if self.finished is not None:
+            return True
+        deadline = time.perf_counter() + budget
+        still_pending = []
+        for asset, future in self.pending:
+            if not future.done() or time.perf_counter() > deadline:
+                still_pending.append((asset, future))
+                continue
+            start = time.perf_counter()
+            self.backend.install_asset(asset, future.result())
+            asset.install_time = time.perf_counter() - start
+            self.installed += 1
+        self.pending = still_pending
+
+        if not self.pending:
+            self.finished = time.perf_counter()
+            self.executor.shutdown(wait=False)
+            if self.verbose:
+                print(self.report())
+        return self.finished is not None
+
+    def report(self, slowest=10):
+        lines = []
+        if self.finished is not None:
+            lines.append(f"{len(self.manifest)} assets loaded in {(self.finished - self.started) * 1e3:.1f} ms")
+        by_cost = sorted(self.manifest, key=lambda asset: asset.decode_time + asset.install_time, reverse=True)
+        for asset in by_cost[:slowest]:
+            lines.append(f"  {asset.kind:<6}{asset.name:<40}decode {asset.decode_time * 1e3:7.2f} ms"
+                         f"  install {asset.install_time * 1e3:6.2f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,126 @@
+import time
+
+import pygame
+
+# sound -> (category, most voices of it that may play at once)
+SOUNDS = {
+    "coin_sound": ("pickup", 2),
+    "key_sound": ("pickup", 1),
+    "hit_sound": ("hit", 1),
+    "door_open_sound": ("world", 1),
+    "level_up_sound": ("event", 1),
+    "game_over_sound": ("event", 1),
+}
+# category -> channels reserved for it
+CATEGORIES = {"pickup": 3, "hit": 1, "world": 1, "event": 2}
+
+# The rate the files in sounds/ are recorded at, so they load without resampling.
+FREQUENCY = 44100
+BUFFER = 256
+
+
+def init_mixer(frequency=FREQUENCY, buffer=BUFFER):
+    """Open the mixer at `frequency` with a `buffer` of that many samples.
+
+    Has to run before `pgzrun` is imported: pgzero initialises pygame then,
+    asking for 22050 Hz with a buffer twice as long, but leaves a mixer that
+    is already open alone.
+    """
+    pygame.mixer.pre_init(frequency=frequency, size=-16, channels=2, buffer=buffer)
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        # No output device: AudioMixer finds no mixer and stays silent.
+        pass
+
+
+class AudioMixer:
+    """Sound effects on reserved channel pools, triggered once per frame.
+
+    `play` only queues a sound; `flush`, called at the end of every update,
+    starts each queued sound once, however many times it was triggered that
+    frame. Every category has its own channels, so a burst of coin pickups
+    can never cut off the hit or game over sounds, and each sound is capped
+    at a number of voices: past the cap its oldest voice is restarted rather
+    than another channel taken. With every channel busy, the oldest voice in
+    the category is stolen.
+
+    The pools are reserved on top of the channels the mixer already has,
+    which stay free for sounds played any other way. `buffer` is the one
+    `init_mixer` opened the mixer with, in samples; it is what bounds output
+    latency.
+    """
+
+    def __init__(self, sounds, buffer=BUFFER, sound_table=SOUNDS, categories=CATEGORIES):
+        self.sounds = sounds
+        self.sound_table = sound_table
+        self.buffer = buffer
+        self.frequency = FREQUENCY
+        self.enabled = pygame.mixer.get_init() is not None
+
+        self.channels = {}
+        if self.enabled:
+            self.frequency = pygame.mixer.get_init()[0]
+            total = sum(categories.values())
+            # Reserved channels are the lowest numbered ones.
+            pygame.mixer.set_num_channels(pygame.mixer.get_num_channels() + total)
+            pygame.mixer.set_reserved(total)
+            index = 0
+            for category, count in categories.items():
+                self.channels[category] = [pygame.mixer.Channel(index + offset) for offset in range(count)]
+                index += count
+        # channel id -> (sound name, start time) of the voice it last played
+        self.voices = {}
+        # sounds triggered this frame, in order
+        self.pending = []
+        self.triggered = 0
+        self.coalesced = 0
+        self.capped = 0
+        self.stolen = 0
+
+    @property
+    def output_latency(self):
+        """Seconds of audio the device buffers ahead of what is heard."""
+        return self.buffer / self.frequency
+
+    def play(self, name):
+        self.triggered += 1
+        if name in self.pending:
+            self.coalesced += 1
+        else:
+            self.pending.append(name)
+
+    def flush(self):
+        if not self.pending:
+            return
+        if self.enabled:
+            now = time.perf_counter()
+            for name in self.pending:
+                self._start(name, now)
+        self.pending.clear()
+
+    def _start(self, name, now):
+        category, max_voices = self.sound_table.get(name, ("event", 1))
+        channels = self.channels[category]
+        voices = self.voices
+
+        playing = [channel for channel in channels
+                   if channel.get_busy() and voices.get(id(channel), (None,))[0] == name]
+        if len(playing) >= max_voices:
+            self.capped += 1
+            channel = min(playing, key=lambda channel: voices[id(channel)][1])
+        else:
+            channel = next((channel for channel in channels if not channel.get_busy()), None)
+            if channel is None:
+                self.stolen += 1
+                channel = min(channels, key=lambda channel: voices.get(id(channel), (None, 0.0))[1])
+
+        channel.play(getattr(self.sounds, name))
+        voices[id(channel)] = (name, now)
+
+    def report(self):
+        if not self.enabled:
+            return f"audio: disabled (no output device), {self.triggered} triggers"
+        return (f"audio: buffer {self.buffer} samples @ {self.frequency} Hz "
+                f"({self.output_latency * 1e3:.1f} ms output latency); "
+                f"{self.triggered} triggers, {self.coalesced} coalesced, {self.capped} capped, {self.stolen} stolen")
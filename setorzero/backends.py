@@ -0,0 +1,133 @@
+import time
+
+import pygame
+from pgzero import ptext
+
+from . import levels
+from .audio import AudioMixer, BUFFER
+from .settings import WIDTH, HEIGHT
+
+active = None
+
+
+def use(backend):
+    global active
+    active = backend
+    return backend
+
+
+class SpriteAtlas:
+    """All frames of one `FrameTable` packed side by side on a single surface.
+
+    Left-facing frames that reuse right-facing images are stored already
+    mirrored, so drawing a frame is one blit of a sub-rectangle.
+    """
+
+    def __init__(self, frames, images):
+        surfaces = []
+        for name, flip in zip(frames.names, frames.flips):
+            surface = images.load(name)
+            if flip:
+                surface = pygame.transform.flip(surface, True, False)
+            surfaces.append(surface)
+
+        width = sum(surface.get_width() for surface in surfaces)
+        height = max(surface.get_height() for surface in surfaces)
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+
+        self.areas = []
+        x = 0
+        for surface in surfaces:
+            area = pygame.Rect(x, 0, surface.get_width(), surface.get_height())
+            self.surface.blit(surface, area, special_flags=pygame.BLEND_RGBA_ADD)
+            self.areas.append(area)
+            x += area.width
+
+
+class PgzeroBackend:
+    """Exposes the globals Pygame Zero injects into the game script.
+
+    `screen` only exists once `pgzrun.go()` opens the window, so it is looked
+    up in the script namespace every time instead of being copied here.
+    """
+
+    def __init__(self, namespace, audio_buffer=BUFFER):
+        self.namespace = namespace
+        self.Actor = namespace["Actor"]
+        self.keyboard = namespace["keyboard"]
+        self.keys = namespace["keys"]
+        self.sounds = namespace["sounds"]
+        self.music = namespace["music"]
+        self.clock = namespace["clock"]
+        self.images = namespace["images"]
+        self.atlases = {}
+        self.audio = AudioMixer(self.sounds, buffer=audio_buffer)
+
+    @property
+    def screen(self):
+        return self.namespace["screen"]
+
+    def make_static_layer(self, actors, origin_x=0, width=WIDTH):
+        """Composite actors that never move onto one opaque surface.
+
+        The layer covers the world from `origin_x` to `origin_x + width`.
+        """
+        layer = pygame.Surface((width, HEIGHT))
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
+        for actor in actors:
+            layer.blit(self.images.load(actor.image), (actor.left - origin_x, actor.top))
+        return layer
+
+    def draw_frame(self, frames, frame, actor, offset_x=0):
+        atlas = self.atlases.get(frames.key)
+        if atlas is None:
+            atlas = self.atlases[frames.key] = SpriteAtlas(frames, self.images)
+        self.screen.surface.blit(atlas.surface, (actor.left - offset_x, actor.top), atlas.areas[frame])
+
+    def image_size(self, name):
+        return self.images.load(name).get_size()
+
+    def draw_actor(self, actor, offset_x=0):
+        self.screen.surface.blit(self.images.load(actor.image), (actor.left - offset_x, actor.top))
+
+    def render_text(self, text, fontsize, color):
+        return ptext.getsurf(text, fontsize=fontsize, color=color, cache=False)
+
+    def decode_asset(self, asset):
+        """Decode one manifest entry; runs on an `AssetPreloader` worker thread."""
+        if asset.kind == "image":
+            return pygame.image.load(asset.path)
+        if asset.kind == "sound":
+            return pygame.mixer.Sound(asset.path)
+        if asset.kind == "level":
+            return levels.load_file(asset.path)
+        # Music is streamed by the mixer; reading it once warms the OS cache.
+        with open(asset.path, "rb") as asset_file:
+            asset_file.read()
+        return None
+
+    def install_asset(self, asset, data):
+        if asset.kind == "image":
+            if pygame.display.get_surface() is not None:
+                data = data.convert_alpha()
+            self.images.cache[(asset.name, (), ())] = data
+        elif asset.kind == "sound":
+            self.sounds.cache[(asset.name, (), ())] = data
+
+    def idle(self, timeout):
+        """Sleep until the next input event or `timeout` seconds; returns the seconds slept.
+
+        The event is put back on the queue for Pygame Zero to dispatch as usual.
+        """
+        start = time.perf_counter()
+        event = pygame.event.wait(int(timeout * 1000))
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+        return time.perf_counter() - start
+
+    def exit(self):
+        self.namespace["exit"]()
@@ -0,0 +1,211 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import backends
+from .settings import ANIMATION_SPEED
+
+
+class EnemyBatch:
+    """Struct-of-arrays version of `Enemy.update` for levels with many enemies.
+
+    The arrays are the source of truth while the batch is in use; `sync`
+    copies them back onto the `Enemy` objects (for drawing, snapshots and
+    anything else that reads enemy attributes). Every step performs the same
+    floating point operations in the same order as the scalar path, so both
+    produce identical positions, directions and animation frames.
+    """
+
+    def __init__(self, enemies, platforms):
+        if np is None:
+            raise RuntimeError("EnemyBatch requires numpy (pip install numpy)")
+
+        self.enemies = list(enemies)
+        self.frames = self.enemies[0].frames if self.enemies else None
+        if any(enemy.frames is not self.frames for enemy in self.enemies):
+            raise ValueError("all enemies in a batch must share one frame table")
+
+        def column(attribute, dtype=float):
+            return np.array([getattr(enemy, attribute) for enemy in self.enemies], dtype=dtype)
+
+        self.x = column("x_position")
+        self.y = column("y_position")
+        self.velocity_y = column("velocity_y")
+        self.on_ground = column("on_ground", bool)
+        self.is_jumping = column("is_jumping", bool)
+        self.facing_right = column("facing_right", bool)
+        self.moving_to_max = column("moving_to_max", bool)
+        self.patrol_min = column("patrol_range_x_min")
+        self.patrol_max = column("patrol_range_x_max")
+        self.speed = column("speed")
+        self.chase_speed = column("chase_speed")
+        self.gravity = column("gravity")
+        self.detection_range = column("detection_range")
+        self.current_frame = column("current_frame", np.intp)
+        self.animation_timer = column("animation_timer")
+        self.frame = column("frame", np.intp)
+
+        rects = np.array([tuple(enemy.actor) for enemy in self.enemies], dtype=float).reshape(-1, 4)
+        self.left, self.top, self.width, self.height = (rects[:, i].copy() for i in range(4))
+
+        platform_rects = np.array([tuple(platform.actor) for platform in platforms], dtype=float).reshape(-1, 4)
+        self.platform_left, self.platform_top, self.platform_width, self.platform_height = \
+            (platform_rects[:, i].copy() for i in range(4))
+        self.platform_right = self.platform_left + self.platform_width
+        self.platform_bottom = self.platform_top + self.platform_height
+
+        if self.frames is not None:
+            self._build_frame_lookup(self.frames)
+
+    def _build_frame_lookup(self, frames):
+        sizes = []
+        for name in frames.names:
+            actor = backends.active.Actor(name, (0, 0))
+            sizes.append((actor.width, actor.height))
+        self.frame_width = np.array([size[0] for size in sizes], dtype=float)
+        self.frame_height = np.array([size[1] for size in sizes], dtype=float)
+
+        # [is_jumping][facing_right] -> sequence; enemies are always moving.
+        sequences = [[frames.run_left, frames.run_right], [frames.jump_left, frames.jump_right]]
+        longest = max(1, max(len(sequence) for pair in sequences for sequence in pair))
+        self.sequence_length = np.array([[len(sequence) for sequence in pair] for pair in sequences], dtype=np.intp)
+        self.sequence_frames = np.zeros((2, 2, longest), dtype=np.intp)
+        for jumping, pair in enumerate(sequences):
+            for facing, sequence in enumerate(pair):
+                self.sequence_frames[jumping, facing, :len(sequence)] = sequence
+        self.idle_first = np.array([frames.idle_left[0], frames.idle_right[0]], dtype=np.intp)
+
+    def update(self, frame_time, player):
+        """Advance every enemy one frame; return True if any now touches the player."""
+        if not self.enemies:
+            return False
+
+        self.is_jumping = ~self.on_ground
+
+        self.velocity_y += self.gravity * frame_time
+        self.y += self.velocity_y * frame_time
+
+        self._land_on_platforms()
+
+        dx = player.x_position - self.x
+        dy = player.y_position - self.y
+        chasing = dx * dx + dy * dy < self.detection_range * self.detection_range
+        self._move(frame_time, dx, chasing)
+
+        self.left = self.x - self.width / 2
+        self.top = self.y - self.height / 2
+        self._animate(frame_time)
+
+        player_left, player_top, player_width, player_height = player.actor
+        touching = ((player_left < self.left + self.width) & (player_top < self.top + self.height) &
+                    (player_left + player_width > self.left) & (player_top + player_height > self.top))
+        return bool(touching.any())
+
+    def _land_on_platforms(self):
+        if not len(self.platform_left):
+            self.on_ground[:] = False
+            return
+
+        left = self.left[:, None]
+        top = self.top[:, None]
+        right = left + self.width[:, None]
+        bottom = top + self.height[:, None]
+        touching = ((left < self.platform_right) & (top < self.platform_bottom) &
+                    (right > self.platform_left) & (bottom > self.platform_top))
+
+        falling = self.velocity_y > 0
+        rising = self.velocity_y < 0
+        hits = touching & ((falling[:, None] & (bottom <= self.platform_bottom)) |
+                           (rising[:, None] & (top >= self.platform_top)))
+        hit_any = hits.any(axis=1)
+        first_hit = hits.argmax(axis=1)
+
+        landed = hit_any & falling
+        bumped = hit_any & rising
+        self.y = np.where(landed, self.platform_top[first_hit] - self.height / 2, self.y)
+        self.y = np.where(bumped, self.platform_bottom[first_hit] + self.height / 2, self.y)
+        self.velocity_y = np.where(hit_any, 0.0, self.velocity_y)
+        self.on_ground = landed
+        self.is_jumping &= ~hit_any
+
+        # Same as `Enemy.land_swept`: the highest platform fallen clean through.
+        new_bottom = self.y[:, None] + self.height[:, None] / 2
+        crossed = ((falling & ~hit_any)[:, None] & (left < self.platform_right) & (right > self.platform_left) &
+                   (bottom <= self.platform_top) & (new_bottom > self.platform_bottom))
+        swept = crossed.any(axis=1)
+        if swept.any():
+            highest = np.where(crossed, self.platform_top, np.inf).argmin(axis=1)
+            self.y = np.where(swept, self.platform_top[highest] - self.height / 2, self.y)
+            self.velocity_y = np.where(swept, 0.0, self.velocity_y)
+            self.on_ground |= swept
+            self.is_jumping &= ~swept
+
+    def _move(self, frame_time, dx, chasing):
+        chase_right = chasing & (dx > 0)
+        chase_left = chasing & (dx < 0)
+        self.x = np.where(chase_right, self.x + self.chase_speed * frame_time, self.x)
+        self.x = np.where(chase_left, self.x - self.chase_speed * frame_time, self.x)
+
+        patrolling = ~chasing
+        patrol_right = patrolling & self.moving_to_max
+        patrol_left = patrolling & ~self.moving_to_max
+        self.x = np.where(patrol_right, self.x + self.speed * frame_time, self.x)
+        self.x = np.where(patrol_left, self.x - self.speed * frame_time, self.x)
+
+        reached_max = patrol_right & (self.x >= self.patrol_max)
+        reached_min = patrol_left & (self.x <= self.patrol_min)
+        self.x = np.where(reached_max, self.patrol_max, self.x)
+        self.x = np.where(reached_min, self.patrol_min, self.x)
+        self.moving_to_max = (self.moving_to_max & ~reached_max) | reached_min
+
+        self.facing_right = (self.facing_right | chase_right | patrol_right) & ~(chase_left | patrol_left)
+
+    def _animate(self, frame_time):
+        self.animation_timer += frame_time
+        ticking = self.animation_timer >= ANIMATION_SPEED
+        if not ticking.any():
+            return
+        self.animation_timer[ticking] = 0
+
+        jumping = self.is_jumping.astype(np.intp)
+        facing = self.facing_right.astype(np.intp)
+        length = self.sequence_length[jumping, facing]
+        has_sequence = length > 0
+
+        advance = ticking & has_sequence
+        self.current_frame = np.where(advance, (self.current_frame + 1) % np.maximum(length, 1), self.current_frame)
+        position = np.minimum(self.current_frame, self.sequence_frames.shape[2] - 1)
+        next_frame = np.where(has_sequence, self.sequence_frames[jumping, facing, position], self.idle_first[facing])
+        self.frame = np.where(ticking, next_frame, self.frame)
+
+        # Changing an actor's image keeps its center: pos is read back from
+        # the old topleft and anchor, then the new anchor is subtracted.
+        center_x = self.left + self.width / 2
+        center_y = self.top + self.height / 2
+        width = np.where(ticking, self.frame_width[self.frame], self.width)
+        height = np.where(ticking, self.frame_height[self.frame], self.height)
+        self.left = np.where(ticking, center_x - width / 2, self.left)
+        self.top = np.where(ticking, center_y - height / 2, self.top)
+        self.width = width
+        self.height = height
+
+    def sync(self):
+        """Copy the batch state back onto the `Enemy` objects."""
+        names = self.frames.names if self.frames is not None else ()
+        for index, enemy in enumerate(self.enemies):
+            enemy.x_position = float(self.x[index])
+            enemy.y_position = float(self.y[index])
+            enemy.velocity_y = float(self.velocity_y[index])
+            enemy.on_ground = bool(self.on_ground[index])
+            enemy.is_jumping = bool(self.is_jumping[index])
+            enemy.facing_right = bool(self.facing_right[index])
+            enemy.moving_to_max = bool(self.moving_to_max[index])
+            enemy.current_frame = int(self.current_frame[index])
+            enemy.animation_timer = float(self.animation_timer[index])
+            enemy.frame = int(self.frame[index])
+            image = names[enemy.frame]
+            if enemy.image != image:
+                enemy.image = image
+                enemy.actor.image = image
+            enemy.actor.topleft = (float(self.left[index]), float(self.top[index]))
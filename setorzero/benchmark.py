@@ -0,0 +1,302 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from array import array
+
+from . import backends, generator, levels
+from .settings import ROOT, WIDTH, HEIGHT, GAME_STATE_PLAYING
+
+SCALES = (1, 10, 100, 1000)
+LAYOUTS = ("wide", "dense", "generated")
+METRICS = ("update_us", "draw_us")
+THRESHOLD = 0.25
+
+
+def synthetic_level(scale, layout="wide", base=None, seed=0):
+    """`base` (level 1 by default) with `scale` times its platforms, coins and enemies.
+
+    "wide" puts the copies side by side in a world `scale` screens wide,
+    with the door at the far end; chunk streaming should keep the per-frame
+    cost flat. "dense" piles them onto the one screen, each copy shifted
+    sideways by a seeded random amount, so everything is in view and every
+    collision query and draw call is paid for. "generated" is a level from
+    `generator` as wide as "wide", with level 1's density.
+    """
+    if base is None:
+        base = levels.load(1)
+    if layout == "generated":
+        from .headless import HeadlessBackend
+
+        # The generator reads sprite sizes and physics through a backend.
+        backends.use(HeadlessBackend())
+        return generator.generate(seed, base.width * scale)
+    rng = random.Random(seed)
+    platforms = array("d")
+    platform_images = array("H")
+    coins = array("d")
+    enemies = array("d")
+    for copy in range(scale):
+        if layout == "wide":
+            offset = copy * base.width
+        elif copy:
+            offset = round(rng.uniform(-base.width / 4, base.width / 4))
+        else:
+            offset = 0
+        for index in range(0, len(base.platforms), 2):
+            platforms.extend((base.platforms[index] + offset, base.platforms[index + 1]))
+        platform_images.extend(base.platform_images)
+        for index in range(0, len(base.coins), 2):
+            coins.extend((base.coins[index] + offset, base.coins[index + 1]))
+        for index in range(0, len(base.enemies), 4):
+            x, y, patrol_min, patrol_max = base.enemies[index:index + 4]
+            enemies.extend((x + offset, y, patrol_min + offset, patrol_max + offset))
+
+    if layout == "wide":
+        width = base.width * scale
+        door = (base.door[0] + width - base.width, base.door[1])
+    else:
+        width = base.width
+        door = base.door
+    return levels.LevelData(list(base.images), platforms, platform_images, coins, enemies,
+                            base.key, door, base.player, width)
+
+
+def offscreen_backend():
+    """A Pygame Zero backend that draws to a surface in memory, with no window or sound."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from pgzero import builtins, loaders
+    from pgzero.screen import Screen
+
+    from .backends import PgzeroBackend
+    from .headless import NullAudio, NullMusic, ScriptedKeyboard
+
+    pygame.display.init()
+    # Images are converted to the display's pixel format, so there must be one.
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    loaders.set_root(ROOT)
+    namespace = dict(vars(builtins))
+    namespace["screen"] = Screen(pygame.Surface((WIDTH, HEIGHT)))
+    backend = PgzeroBackend(namespace)
+    backend.keyboard = ScriptedKeyboard()
+    backend.audio = NullAudio()
+    backend.music = NullMusic()
+    return backend
+
+
+def scripted_input(keyboard, frame):
+    """Runs one way and then the other, jumping every half second."""
+    keys = ("right",) if (frame // 240) % 2 == 0 else ("left",)
+    if frame % 30 < 5:
+        keys += ("space",)
+    keyboard.set(keys)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def measure(level, frames=120, warmup=10, budget=10.0, frame_time=1 / 60, draw=True, **game_options):
+    """Time `Game.update` and `Game.draw` on `level`, frame by frame.
+
+    The first `warmup` frames are not timed; past `budget` seconds the
+    warmup is cut short and, after three timed frames, so is the run, so
+    the largest cases stay bounded. Without `draw` the game runs headless
+    and only updates are timed.
+    """
+    from .game import Game
+    from .headless import HeadlessBackend
+
+    backend = offscreen_backend() if draw else HeadlessBackend()
+    start = time.perf_counter()
+    game = Game(backend, **game_options)
+    game._setup_level(level)
+    game.game_state = GAME_STATE_PLAYING
+    setup_seconds = time.perf_counter() - start
+
+    keyboard = backend.keyboard
+    update_times = []
+    draw_times = []
+    spent = 0.0
+    frame = 0
+    while len(update_times) < frames and (len(update_times) < 3 or spent < budget):
+        # Dying would end the run; the benchmark is about cost, not survival.
+        if game.game_state != GAME_STATE_PLAYING:
+            game.total_lives = 3
+            game.game_state = GAME_STATE_PLAYING
+        scripted_input(keyboard, frame)
+        backend.clock.tick(frame_time)
+        start = time.perf_counter()
+        game.update(frame_time)
+        middle = time.perf_counter()
+        if draw:
+            game.draw()
+        end = time.perf_counter()
+        spent += end - start
+        if frame >= warmup or spent > budget:
+            update_times.append(middle - start)
+            draw_times.append(end - middle)
+        frame += 1
+
+    entities = len(level.platforms) // 2 + len(level.coins) // 2 + len(level.enemies) // 4
+    update_us = _percentile(update_times, 0.5) * 1e6
+    draw_us = _percentile(draw_times, 0.5) * 1e6 if draw else None
+    return {
+        "platforms": len(level.platforms) // 2,
+        "coins": len(level.coins) // 2,
+        "enemies": len(level.enemies) // 4,
+        "entities": entities,
+        "loaded": len(game.platforms) + len(game.coins) + len(game.enemies),
+        "frames": len(update_times),
+        "setup_ms": setup_seconds * 1e3,
+        "update_us": update_us,
+        "update_p95_us": _percentile(update_times, 0.95) * 1e6,
+        "update_us_per_entity": update_us / entities,
+        "draw_us": draw_us,
+        "draw_p95_us": _percentile(draw_times, 0.95) * 1e6 if draw else None,
+        "draw_us_per_entity": draw_us / entities if draw else None,
+    }
+
+
+def run_suite(scales=SCALES, layouts=LAYOUTS, progress=None, **options):
+    """`measure` every layout at every scale; one result per case, keyed by `case_name`."""
+    base = levels.load(1)
+    results = {}
+    for layout in layouts:
+        for scale in scales:
+            result = measure(synthetic_level(scale, layout, base), **options)
+            result.update(layout=layout, scale=scale)
+            results[case_name(layout, scale)] = result
+            if progress is not None:
+                progress(result)
+    return results
+
+
+def case_name(layout, scale):
+    return f"{layout}x{scale}"
+
+
+def growth(results, metric):
+    """Per layout, how `metric` grows with scale: the exponent k in time ~ scale**k, per step."""
+    exponents = {}
+    for layout in sorted({result["layout"] for result in results.values()}):
+        cases = sorted((result["scale"], result[metric]) for result in results.values()
+                       if result["layout"] == layout and result[metric])
+        exponents[layout] = [
+            {"from": low, "to": high, "exponent": math.log(high_time / low_time) / math.log(high / low)}
+            for (low, low_time), (high, high_time) in zip(cases, cases[1:])
+        ]
+    return exponents
+
+
+def compare(results, baseline, thresholds):
+    """Cases and metrics slower than `baseline` by more than their threshold.
+
+    `thresholds` maps a metric to the allowed fractional slowdown, with the
+    "default" entry for the rest. Cases missing from either side are
+    skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            limit = thresholds.get(metric, thresholds.get("default", THRESHOLD))
+            change = new / old - 1
+            if change > limit:
+                regressions.append({"case": name, "metric": metric, "baseline": old, "current": new,
+                                    "change": change, "threshold": limit})
+    return regressions
+
+
+def save_baseline(path, results, thresholds):
+    with open(path, "w") as baseline_file:
+        json.dump({"thresholds": thresholds, "results": results}, baseline_file, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as baseline_file:
+        data = json.load(baseline_file)
+    return data["results"], data.get("thresholds", {})
+
+
+def _threshold(text):
+    metric, _, value = text.rpartition("=")
+    return metric or "default", float(value)
+
+
+def _format(result):
+    draw = (f"draw {result['draw_us']:9.0f} us ({result['draw_us_per_entity']:6.2f}/entity)"
+            if result["draw_us"] is not None else "")
+    return (f"  {case_name(result['layout'], result['scale']):<11}{result['entities']:>7} entities "
+            f"({result['loaded']:>6} loaded)  update {result['update_us']:9.0f} us "
+            f"({result['update_us_per_entity']:6.2f}/entity)  {draw}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m setorzero.benchmark",
+                                     description="Time Game.update and Game.draw on level 1 scaled up.")
+    parser.add_argument("--scales", type=lambda text: [int(value) for value in text.split(",")],
+                        default=list(SCALES), metavar="N1,N2,...")
+    parser.add_argument("--layouts", type=lambda text: text.split(","), default=list(LAYOUTS),
+                        metavar="wide,dense,generated")
+    parser.add_argument("--frames", type=int, default=120, help="frames measured per case")
+    parser.add_argument("--budget", type=float, default=10.0, help="seconds after which a case stops early")
+    parser.add_argument("--no-draw", action="store_true", help="run headless and time only updates")
+    parser.add_argument("--batch-enemies", action="store_true")
+    parser.add_argument("--ai-lod", action="store_true")
+    parser.add_argument("--json", metavar="PATH", help="write the results here")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results as a baseline to compare against")
+    parser.add_argument("--baseline", metavar="PATH", help="fail if slower than this baseline")
+    parser.add_argument("--threshold", type=_threshold, action="append", default=[], metavar="[METRIC=]FRACTION",
+                        help=f"allowed slowdown, e.g. 0.25 or draw_us=0.5 (default {THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    for layout in args.layouts:
+        if layout not in LAYOUTS:
+            parser.error(f"unknown layout: {layout}")
+
+    results = run_suite(args.scales, args.layouts, progress=lambda result: print(_format(result), flush=True),
+                        frames=args.frames, budget=args.budget, draw=not args.no_draw,
+                        batch_enemies=args.batch_enemies, ai_lod=args.ai_lod)
+    for metric in METRICS:
+        for layout, steps in growth(results, metric).items():
+            if steps:
+                print(f"{metric} {layout}: " + ", ".join(
+                    f"x{step['from']}->x{step['to']} ~n^{step['exponent']:.2f}" for step in steps))
+
+    thresholds = dict(args.threshold)
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump({"growth": {metric: growth(results, metric) for metric in METRICS}, "results": results},
+                      report_file, indent=2)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, thresholds)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline, saved_thresholds = load_baseline(args.baseline)
+        regressions = compare(results, baseline, saved_thresholds | thresholds)
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} {regression['metric']}: {regression['baseline']:.0f} -> "
+                  f"{regression['current']:.0f} us ({regression['change']:+.0%}, "
+                  f"allowed {regression['threshold']:+.0%})")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+from .settings import WIDTH
+
+
+class Camera:
+    """Horizontal viewport over a world that can be wider than the screen.
+
+    `x` is the world coordinate of the screen's left edge. It is kept whole
+    so sprites and background chunks line up on the same pixels.
+    """
+
+    def __init__(self, world_width=WIDTH, view_width=WIDTH):
+        self.world_width = world_width
+        self.view_width = view_width
+        self.x = 0
+
+    @property
+    def scrolls(self):
+        return self.world_width > self.view_width
+
+    def follow(self, target_x):
+        """Center the view on `target_x` without showing past the world edges."""
+        if not self.scrolls:
+            self.x = 0
+            return
+        left = target_x - self.view_width / 2
+        self.x = int(round(min(max(left, 0), self.world_width - self.view_width)))
+
+    def to_screen(self, rect):
+        return rect.move(-self.x, 0)
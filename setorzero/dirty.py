@@ -0,0 +1,133 @@
+from pygame import Rect
+
+from .entities import overlaps
+from .settings import WIDTH
+
+
+def actor_rect(actor, offset_x=0):
+    """Integer screen rect covering everything a blit at the actor's float topleft can touch."""
+    return Rect(int(actor.left - offset_x) - 1, int(actor.top) - 1, int(actor.width) + 3, int(actor.height) + 3)
+
+
+def merge_rects(rects):
+    """Union overlapping rects until none overlap, so no region is redrawn twice."""
+    merged = []
+    for rect in rects:
+        rect = Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRenderer:
+    """Redraws only the parts of the playing screen that changed since last frame.
+
+    Each frame it collects the rect and look (animation frame, image, text
+    surface) of everything that can change: enemies, the player, the key,
+    the door, HUD labels and the profiler overlay. Collected coins are found
+    by comparing the coin list with the last frame. Regions whose contents
+    changed are restored from the static layer and everything overlapping
+    them is redrawn in the usual order, clipped to the region, so the result
+    is pixel-identical to a full redraw. Any camera movement forces a full
+    redraw, since then every pixel of the world moves.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.previous = {}
+        self.coin_rects = {}
+        self.full = True
+        self.dirty = []
+        self.camera_x = None
+
+    def invalidate(self):
+        self.full = True
+
+    def _items(self):
+        game = self.game
+        camera_x = self.camera_x
+        items = {}
+        if not game.key.collected:
+            items[game.key] = (actor_rect(game.key.actor, camera_x), None)
+        items[game.door] = (actor_rect(game.door.actor, camera_x), game.door.actor.image)
+        for enemy in game.enemies:
+            items[enemy] = (actor_rect(enemy.actor, camera_x), enemy.frame)
+        items[game.player] = (actor_rect(game.player.actor, camera_x), game.player.frame)
+        for label, value in game._hud_labels():
+            label.update(game.text_cache, value)
+            if label.surface is not None:
+                items[label] = (label.surface.get_rect(topleft=label.pos), label.surface)
+        overlay = game.profiler_overlay if game.profiler.show_overlay else None
+        if overlay is not None:
+            items[overlay] = (overlay.get_rect(topright=(WIDTH - 10, 10)), None)
+        return items
+
+    def collect(self):
+        """Work out this frame's dirty regions; returns False if a full redraw is needed."""
+        game = self.game
+        if game.enemy_batch is not None:
+            game.enemy_batch.sync()
+        if game.camera.x != self.camera_x:
+            self.camera_x = game.camera.x
+            self.full = True
+        items = self._items()
+
+        if self.full:
+            self.full = False
+            self.previous = items
+            self.coin_rects = {coin: actor_rect(coin.actor, self.camera_x) for coin in game.coins}
+            self.dirty = []
+            return False
+
+        dirty = []
+        previous = self.previous
+        for item, state in items.items():
+            old = previous.pop(item, None)
+            if old != state:
+                dirty.append(state[0])
+                if old is not None:
+                    dirty.append(old[0])
+        for rect, look in previous.values():
+            dirty.append(rect)
+        self.previous = items
+
+        if len(self.coin_rects) != len(game.coins):
+            remaining = set(game.coins)
+            for coin in [coin for coin in self.coin_rects if coin not in remaining]:
+                dirty.append(self.coin_rects.pop(coin))
+
+        self.dirty = merge_rects(dirty)
+        return True
+
+    def redraw(self, screen, layers):
+        game = self.game
+        surface = screen.surface
+        camera_x = self.camera_x
+        items = self.previous
+        hud_labels = game._hud_labels()
+        overlay = game.profiler_overlay if game.profiler.show_overlay else None
+        for rect in self.dirty:
+            surface.set_clip(rect)
+            game._draw_background(screen, layers)
+            # Blits land on truncated float positions; test against a slightly larger area.
+            area = rect.inflate(4, 4).move(camera_x, 0)
+            for coin in game.coin_grid.query(area):
+                coin.draw(camera_x)
+            if overlaps(game.key.actor, area):
+                game.key.draw(camera_x)
+            if overlaps(game.door.actor, area):
+                game.door.draw(camera_x)
+            for enemy in game.enemies:
+                if overlaps(enemy.actor, area):
+                    enemy.draw(camera_x)
+            if overlaps(game.player.actor, area):
+                game.player.draw(camera_x)
+            for label, value in hud_labels:
+                if label in items and rect.colliderect(items[label][0]):
+                    label.draw(screen, game.text_cache, value)
+            if overlay is not None and rect.colliderect(items[overlay][0]):
+                game._draw_profiler_overlay(screen)
+        surface.set_clip(None)
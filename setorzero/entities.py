@@ -0,0 +1,369 @@
+from pgzero.rect import ZRect
+
+from . import backends
+from .animation import frame_table
+from .settings import WIDTH, ANIMATION_SPEED
+
+class StaticSprite(ZRect):
+    """Rect and image name of something that never moves or animates.
+
+    Used instead of an `Actor` where only the geometry and the image are
+    needed; the rect is center-anchored exactly like an `Actor`'s. The
+    constructor is `ZRect`'s, which its methods rely on; use `at` instead.
+    """
+
+    image = None
+
+    @classmethod
+    def at(cls, image, pos):
+        sprite = cls(0, 0, 0, 0)
+        sprite.place(image, pos)
+        return sprite
+
+    def place(self, image, pos):
+        width, height = backends.active.image_size(image)
+        self.image = image
+        self.w = width
+        self.h = height
+        self.x = pos[0] - width / 2
+        self.y = pos[1] - height / 2
+
+def overlaps(a, b):
+    """`a.colliderect(b)` for actors and rects, without the temporary rect pgzero builds for it.
+
+    Every pgzero rect holds a reference to itself, so each of those
+    temporaries is garbage only the cycle collector can free.
+    """
+    return a.left < b.right and a.top < b.bottom and a.right > b.left and a.bottom > b.top
+
+class AnimatedSprite:
+    __slots__ = ("x_position", "y_position", "sprite_prefix", "frames", "is_jumping", "current_frame",
+                 "animation_timer", "is_moving", "facing_right", "frame", "image", "actor")
+
+    def __init__(self, x_position, y_position, sprite_prefix, num_idle_right_frames, num_idle_left_frames, 
+                 num_run_right_frames, num_run_left_frames, num_jump_right_frames=0, num_jump_left_frames=0):
+        self.sprite_prefix = sprite_prefix
+        self.frames = frame_table(sprite_prefix, num_idle_right_frames, num_idle_left_frames,
+                                  num_run_right_frames, num_run_left_frames, num_jump_right_frames, num_jump_left_frames)
+        self.actor = None
+        self.reset_sprite(x_position, y_position)
+
+    def reset_sprite(self, x_position, y_position):
+        """Put the sprite back in its initial pose, reusing the existing actor."""
+        self.x_position = x_position
+        self.y_position = y_position
+        self.is_jumping = False 
+
+        self.current_frame = 0
+        self.animation_timer = 0
+        self.is_moving = False
+        self.facing_right = True
+
+        self.frame = self.frames.idle_right[0]
+        self.image = self.frames.names[self.frame]
+        if self.actor is None:
+            self.actor = backends.active.Actor(self.image, (self.x_position, self.y_position))
+        else:
+            self.actor.image = self.image
+            self.actor.pos = (self.x_position, self.y_position)
+
+    def update_animation(self, frame_time):
+        self.animation_timer += frame_time
+        if self.animation_timer >= ANIMATION_SPEED:
+            self.animation_timer = 0
+            frames = self.frames
+        
+            if self.is_jumping: 
+                sequence = frames.jump_right if self.facing_right else frames.jump_left
+                if sequence:
+                    self.current_frame = (self.current_frame + 1) % len(sequence)
+                    frame = sequence[self.current_frame]
+                else:
+                    frame = frames.idle_right[0] if self.facing_right else frames.idle_left[0]
+            else:
+                if self.is_moving:
+                    sequence = frames.run_right if self.facing_right else frames.run_left
+                else:
+                    sequence = frames.idle_right if self.facing_right else frames.idle_left
+                self.current_frame = (self.current_frame + 1) % len(sequence)
+                frame = sequence[self.current_frame]
+
+            self.frame = frame
+            self.image = frames.names[frame]
+            self.actor.image = self.image
+
+    def fall_distance(self, frame_time):
+        """How far the sprite can fall during `frame_time`; 0 while rising."""
+        fall = (self.velocity_y + self.gravity * frame_time) * frame_time
+        return fall if fall > 0 else 0
+
+    def land_swept(self, platforms):
+        """Land on the highest platform the sprite fell clean through during this step.
+
+        The regular check only sees platforms the actor overlapped before
+        moving, so a long step could carry it from above a platform to below
+        it without ever touching.
+        """
+        left, top, width, height = self.actor
+        right = left + width
+        old_bottom = top + height
+        bottom = self.y_position + height / 2
+        landing = None
+        for platform in platforms:
+            rect = platform.actor
+            if (bottom > rect.bottom and old_bottom <= rect.top and left < rect.right and right > rect.left
+                    and (landing is None or rect.top < landing.top)):
+                landing = rect
+        if landing is not None:
+            self.y_position = landing.top - height / 2
+            self.velocity_y = 0
+            self.on_ground = True
+            self.is_jumping = False
+
+    def draw(self, offset_x=0):
+        backends.active.draw_frame(self.frames, self.frame, self.actor, offset_x)
+
+class Player(AnimatedSprite):
+    __slots__ = ("speed", "jump_strength", "gravity", "velocity_y", "on_ground", "have_key", "score",
+                 "invulnerable", "invulnerability_duration", "world_width")
+
+    def __init__(self, x_position, y_position):
+        super().__init__(x_position, y_position, "player", 
+                         num_idle_right_frames=2, num_idle_left_frames=2, 
+                         num_run_right_frames=4, num_run_left_frames=4, 
+                         num_jump_right_frames=1, num_jump_left_frames=1)
+        self.speed = 200
+        self.jump_strength = -450
+        self.gravity = 800
+        self.velocity_y = 0
+        self.on_ground = False
+        self.actor.pos = (self.x_position, self.y_position)
+        self.have_key = False
+        self.score = 0 
+        
+        self.invulnerable = False
+        self.invulnerability_duration = 5.0
+        self.actor.image_alpha = 255
+        self.world_width = WIDTH
+
+    def update(self, frame_time, platforms, keyboard):
+        self.is_moving = False
+        self.is_jumping = not self.on_ground 
+                
+        if keyboard.left or keyboard.a:
+            self.x_position -= self.speed * frame_time
+            self.is_moving = True
+            self.facing_right = False
+        if keyboard.right or keyboard.d:
+            self.x_position += self.speed * frame_time
+            self.is_moving = True
+            self.facing_right = True
+
+        self.velocity_y += self.gravity * frame_time
+        self.y_position += self.velocity_y * frame_time
+
+        self.on_ground = False
+        for platform in platforms:
+            if overlaps(self.actor, platform.actor):
+                if self.velocity_y > 0 and self.actor.bottom <= platform.actor.bottom:
+                    self.y_position = platform.actor.top - self.actor.height / 2
+                    self.velocity_y = 0
+                    self.on_ground = True
+                    self.is_jumping = False
+        if not self.on_ground and self.velocity_y > 0:
+            self.land_swept(platforms)
+
+        if (keyboard.space or keyboard.w) and self.on_ground:
+            self.velocity_y = self.jump_strength
+            self.is_jumping = True 
+
+        if self.x_position < self.actor.width / 2:
+            self.x_position = self.actor.width / 2
+        if self.x_position > self.world_width - self.actor.width / 2:
+            self.x_position = self.world_width - self.actor.width / 2
+        
+        self.actor.pos = (self.x_position, self.y_position)
+        self.update_animation(frame_time)
+
+class Enemy(AnimatedSprite):
+    __slots__ = ("speed", "chase_speed", "patrol_range_x_min", "patrol_range_x_max", "moving_to_max",
+                 "detection_range", "gravity", "jump_strength", "velocity_y", "on_ground", "tick_time")
+
+    def __init__(self, x, y, patrol_range_x_min, patrol_range_x_max):
+        super().__init__(x, y, "enemy", 
+                         num_idle_right_frames=2, num_idle_left_frames=2, 
+                         num_run_right_frames=2, num_run_left_frames=2, 
+                         num_jump_right_frames=0, num_jump_left_frames=0)
+        self._reset_patrol(patrol_range_x_min, patrol_range_x_max)
+
+    def reset(self, x, y, patrol_range_x_min, patrol_range_x_max):
+        self.reset_sprite(x, y)
+        self._reset_patrol(patrol_range_x_min, patrol_range_x_max)
+
+    def _reset_patrol(self, patrol_range_x_min, patrol_range_x_max):
+        self.speed = 80
+        self.chase_speed = 100 
+        self.patrol_range_x_min = patrol_range_x_min
+        self.patrol_range_x_max = patrol_range_x_max
+        self.moving_to_max = True
+        self.actor.pos = (self.x_position, self.y_position)
+        self.is_moving = True 
+        self.detection_range = 150
+        self.gravity = 800 
+        self.jump_strength = -450
+        self.velocity_y = 0
+        self.on_ground = False
+        self.tick_time = 0
+
+    def update(self, frame_time, player, platforms, navigation=None):
+        self.is_jumping = not self.on_ground
+
+        self.velocity_y += self.gravity * frame_time
+        self.y_position += self.velocity_y * frame_time
+
+        self.on_ground = False
+        for platform in platforms:
+            if overlaps(self.actor, platform.actor):
+                if self.velocity_y > 0 and self.actor.bottom <= platform.actor.bottom:
+                    self.y_position = platform.actor.top - self.actor.height / 2
+                    self.velocity_y = 0
+                    self.on_ground = True
+                    self.is_jumping = False
+                elif self.velocity_y < 0 and self.actor.top >= platform.actor.top:
+                    self.y_position = platform.actor.bottom + self.actor.height / 2
+                    self.velocity_y = 0
+                    self.is_jumping = False
+        if not self.on_ground and self.velocity_y > 0:
+            self.land_swept(platforms)
+
+        dx = player.x_position - self.x_position
+        dy = player.y_position - self.y_position
+        distance = dx * dx + dy * dy
+
+        chasing = distance < self.detection_range * self.detection_range
+        if navigation is not None and (chasing or navigation.pursues(self, dx)):
+            chasing = True
+            dx = navigation.steer(self, dx)
+
+        if chasing:
+            self.is_moving = True
+            if dx > 0:
+                self.x_position += self.chase_speed * frame_time
+                self.facing_right = True
+            elif dx < 0:
+                self.x_position -= self.chase_speed * frame_time
+                self.facing_right = False
+        else:
+            self.is_moving = True
+            if self.moving_to_max:
+                self.x_position += self.speed * frame_time
+                self.facing_right = True
+                if self.x_position >= self.patrol_range_x_max:
+                    self.x_position = self.patrol_range_x_max
+                    self.moving_to_max = False
+            else:
+                self.x_position -= self.speed * frame_time
+                self.facing_right = False
+                if self.x_position <= self.patrol_range_x_min:
+                    self.x_position = self.patrol_range_x_min
+                    self.moving_to_max = True
+
+        self.actor.pos = (self.x_position, self.y_position)
+        self.update_animation(frame_time)
+
+class Platform:
+    __slots__ = ("x_position", "y_position", "actor")
+
+    def __init__(self, x_position, y_position, image_name="platform"):
+        self.actor = None
+        self.reset(x_position, y_position, image_name)
+
+    def reset(self, x_position, y_position, image_name="platform"):
+        self.x_position = x_position
+        self.y_position = y_position
+        if self.actor is None:
+            self.actor = StaticSprite.at(image_name, (self.x_position, self.y_position))
+        else:
+            self.actor.place(image_name, (self.x_position, self.y_position))
+
+    def draw(self, offset_x=0):
+        backends.active.draw_actor(self.actor, offset_x)
+
+class Coin:
+    __slots__ = ("x_position", "y_position", "actor", "slot")
+
+    def __init__(self, x_position, y_position):
+        self.actor = None
+        self.slot = -1
+        self.reset(x_position, y_position)
+
+    def reset(self, x_position, y_position):
+        self.x_position = x_position
+        self.y_position = y_position
+        if self.actor is None:
+            self.actor = StaticSprite.at("coin", (self.x_position, self.y_position))
+        else:
+            self.actor.place("coin", (self.x_position, self.y_position))
+
+    def draw(self, offset_x=0):
+        backends.active.draw_actor(self.actor, offset_x)
+
+class Key:
+    __slots__ = ("x_position", "y_position", "actor", "collected")
+
+    def __init__(self, x_position, y_position):
+        self.actor = None
+        self.reset(x_position, y_position)
+
+    def reset(self, x_position, y_position):
+        self.x_position = x_position
+        self.y_position = y_position
+        if self.actor is None:
+            self.actor = StaticSprite.at("key", (self.x_position, self.y_position))
+        else:
+            self.actor.place("key", (self.x_position, self.y_position))
+        self.collected = False
+
+    def draw(self, offset_x=0):
+        if not self.collected:
+            backends.active.draw_actor(self.actor, offset_x)
+
+class Door:
+    __slots__ = ("x_position", "y_position", "actor", "is_open")
+
+    def __init__(self, x_position, y_position):
+        self.actor = None
+        self.reset(x_position, y_position)
+
+    def reset(self, x_position, y_position):
+        self.x_position = x_position
+        self.y_position = y_position
+        if self.actor is None:
+            self.actor = StaticSprite.at("door_closed", (self.x_position, self.y_position))
+        else:
+            self.actor.place("door_closed", (self.x_position, self.y_position))
+        self.is_open = False
+
+    def open_door(self):
+        self.is_open = True
+        self.actor.place("door_open", (self.x_position, self.y_position))
+        backends.active.audio.play("door_open_sound")
+
+    def draw(self, offset_x=0):
+        backends.active.draw_actor(self.actor, offset_x)
+
+class Button:
+    __slots__ = ("actor", "callback")
+
+    def __init__(self, x, y, image_name, callback):
+        self.actor = backends.active.Actor(image_name, (x, y))
+        self.callback = callback
+
+    def draw(self):
+        self.actor.draw()
+
+    def on_mouse_down(self, pos):
+        if self.actor.collidepoint(pos):
+            self.callback()
+            return True
+        return False
@@ -0,0 +1,549 @@
+import os
+
+from pygame import Rect
+
+from . import backends, levels, snapshot
+from .batch import EnemyBatch
+from .camera import Camera
+from .dirty import DirtyRenderer
+from .entities import Player, Key, Door, Button, overlaps
+from .memory import AllocationTracker, GCScheduler
+from .navigation import NavigationGraph
+from .profiler import FrameProfiler
+from .scenes import SCENES
+from .scheduler import AIScheduler
+from .text import TextCache, TextLabel
+from .timestep import FixedTimestep
+from .world import ChunkedWorld, make_pools
+from .settings import (
+    WIDTH, HEIGHT, TITLE, SUBTITLE,
+    WHITE, BLACK, GRAY, GOLD, GREEN, RED, BLUE, YELLOW,
+    GAME_STATE_MENU, GAME_STATE_PLAYING, GAME_STATE_LEVEL_COMPLETE, GAME_STATE_GAME_OVER, GAME_STATE_LOADING,
+)
+
+class Game:
+    def __init__(self, backend, batch_enemies=False, preloader=None, dirty_rendering=False, ai_lod=False,
+                 physics_rate=None, pursuit=False, level_loader=None, track_allocations=False, tuned_gc=False):
+        self.backend = backends.use(backend)
+        self.batch_enemies = batch_enemies
+        self.preloader = preloader
+        # game_state switches between these; see the property below.
+        self.scenes = {scene.state: scene(self) for scene in SCENES}
+        self.scene = None
+        self.game_state = GAME_STATE_LOADING if preloader is not None else GAME_STATE_MENU
+        self.player = None
+        self.enemies = []
+        self.active_enemies = []
+        self.enemy_batch = None
+        self.platforms = []
+        self.coins = []
+        self.key = None
+        self.door = None
+        self.world = None
+        self.pools = make_pools()
+        self.levels = {}
+        # level number -> LevelData; the level files unless levels are generated.
+        self.level_loader = level_loader or levels.load
+        self.level_number = None
+        self.camera = Camera()
+        self.platform_grid = None
+        self.coin_grid = None
+        self.static_layers = {}
+        self.player_start = None
+        self.music_on = True
+        self.menu_buttons = []
+        self.total_lives = 3
+        self.text_cache = TextCache(self.backend.render_text)
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = None
+        self.dirty_renderer = DirtyRenderer(self) if dirty_rendering else None
+        self.ai_scheduler = AIScheduler() if ai_lod else None
+        # Allocations kept by each update and draw, by call site; see memory.py.
+        self.allocations = AllocationTracker() if track_allocations else None
+        if self.allocations is not None:
+            self.allocations.start()
+        # Garbage is only collected between levels, not while playing.
+        self.gc_scheduler = GCScheduler() if tuned_gc else None
+        # Enemies follow the player between floors along the level's
+        # navigation graph; the batched update keeps to plain chasing.
+        self.pursuit = pursuit
+        self.navigation = None
+        # With a physics rate the simulation runs in fixed steps and sprites
+        # are drawn between the last two; without one it follows frame_time.
+        self.timestep = FixedTimestep(physics_rate) if physics_rate else None
+        # Gameplay timers count simulated time, so they follow the physics
+        # steps and can be saved and restored exactly.
+        self.sim_time = 0.0
+        # Interpolated sprites, their positions before the last step
+        # (previous_positions is None when there is nothing to interpolate
+        # from) and their simulated rects, refilled in place every frame.
+        self.interpolated_sprites = []
+        self.previous_positions = None
+        self.position_buffer = []
+        self.simulated_positions = []
+        self.invulnerable_until = 0.0
+        self.quick_save_slot = None
+        self.save_path = None
+        # Called with the snapshot after every quick load; a Recorder logs it.
+        self.on_restore = None
+        
+        self._setup_labels()
+        self._setup_menu()
+        if self.preloader is None:
+            self._load_music_and_sounds()
+            self.backend.music.unpause()
+
+    @property
+    def game_state(self):
+        return self.scene.state
+
+    @game_state.setter
+    def game_state(self, state):
+        scene = self.scenes[state]
+        if scene is not self.scene:
+            if self.scene is not None:
+                self.scene.exit()
+            self.scene = scene
+            scene.enter()
+
+    @property
+    def idle(self):
+        """True while nothing on screen can change until the next input event."""
+        return self.scene.static and not self.scene.needs_redraw and not self.profiler.show_overlay
+
+    def _setup_labels(self):
+        self.loading_label = TextLabel("Carregando...", 40, WHITE, center=(WIDTH / 2, HEIGHT / 2 - 40))
+        self.loading_bar = Rect(WIDTH / 2 - 200, HEIGHT / 2, 400, 20)
+
+        self.title_label = TextLabel(TITLE, 60, BLUE, center=(WIDTH / 2, HEIGHT / 2 - 160))
+        self.subtitle_label = TextLabel(SUBTITLE, 30, WHITE, center=(WIDTH / 2, HEIGHT / 2 - 120))
+
+        self.score_label = TextLabel("Moedas: {}", 30, GOLD, topleft=(10, 10))
+        self.key_label = TextLabel("Chave: {}", 30, BLUE, topleft=(10, 40))
+        self.lives_label = TextLabel("Vidas: {}", 30, RED, topleft=(10, 70))
+        self.door_message_label = TextLabel("Pressione F para abrir a porta!", 40, YELLOW, center=(WIDTH - 280, HEIGHT - 120))
+        # [label, value] pairs; _hud_labels fills in the values every frame
+        # and hands back one of these two lists.
+        self.hud_entries = [[self.score_label, 0], [self.key_label, ""], [self.lives_label, 0],
+                            [self.door_message_label, None]]
+        self.hud_entries_without_door = self.hud_entries[:3]
+
+        self.victory_label = TextLabel("VOCÊ VENCEU O JOGO!", 80, GREEN, center=(WIDTH / 2, HEIGHT / 2 - 100))
+        self.final_score_label = TextLabel("Pontuação Final: {}", 50, GOLD, center=(WIDTH / 2, HEIGHT / 2))
+        self.remaining_lives_label = TextLabel("Vidas Restantes: {}", 40, RED, center=(WIDTH / 2, HEIGHT / 2 + 60))
+        self.continue_label = TextLabel("Pressione ESPAÇO para continuar", 30, GRAY, center=(WIDTH / 2, HEIGHT - 100))
+
+        self.game_over_label = TextLabel("GAME OVER", 70, RED, center=(WIDTH / 2, HEIGHT / 2 - 50))
+        self.game_over_score_label = TextLabel("Sua Pontuação: {}", 40, GOLD, center=(WIDTH / 2, HEIGHT / 2 + 10))
+        self.retry_label = TextLabel("Pressione ESPAÇO para tentar novamente", 30, GRAY, center=(WIDTH / 2, HEIGHT / 2 + 80))
+
+    def _setup_menu(self):
+        # Built once; returning to the menu reuses the same buttons.
+        self.menu_buttons.append(Button(WIDTH / 2, HEIGHT / 2 - 30, "menu/button_start", self.start_game))
+        self.music_button = Button(WIDTH / 2, HEIGHT / 2 + 30, "menu/button_music_on", self.toggle_music)
+        self.menu_buttons.append(self.music_button)
+        self.menu_buttons.append(Button(WIDTH / 2, HEIGHT / 2 + 90, "menu/button_exit", self.exit_game))
+
+    def _finish_loading(self):
+        self.game_state = GAME_STATE_MENU
+        self.title_label.update(self.text_cache)
+        self.subtitle_label.update(self.text_cache)
+        self._load_music_and_sounds()
+        self.backend.music.unpause()
+
+    def _load_music_and_sounds(self):
+        self.backend.music.play("background_music")
+        self.backend.music.set_volume(0.5)
+
+    def start_game(self):
+        self.total_lives = 3 
+        self._load_level(1)
+        self.game_state = GAME_STATE_PLAYING
+        if self.music_on:
+            self.backend.music.unpause()
+
+    def _load_level(self, level_number):
+        self._build_level(self._level_data(level_number))
+
+    def _level_data(self, level_number):
+        # LevelData is never modified, so restarts reuse the parsed level.
+        level = self.levels.get(level_number)
+        if level is None:
+            level = self.levels[level_number] = self.level_loader(level_number)
+        self.level_number = level_number
+        return level
+
+    def _build_level(self, level):
+        self._setup_level(level)
+        self.level_complete()
+
+    def _setup_level(self, level):
+        self.player_start = level.player
+        if self.player: 
+            self.player.x_position, self.player.y_position = self.player_start
+            self.player.velocity_y = 0
+            self.player.have_key = False 
+            self.player.on_ground = False 
+            self.player.is_jumping = False
+            self.player.invulnerable = False 
+        else: 
+            self.player = Player(*self.player_start)
+        self.player.world_width = level.width
+            
+        self.show_door_message = False 
+
+        if self.world is not None and self.world.level is level:
+            self.world.reset()
+        else:
+            if self.world is not None:
+                self.world.reset()
+            self.world = ChunkedWorld(level, pools=self.pools)
+        self.platforms = self.world.platforms
+        self.coins = self.world.coins
+        self.enemies = self.world.enemies
+        self.active_enemies = self.world.active_enemies
+        self.platform_grid = self.world.platform_grid
+        self.coin_grid = self.world.coin_grid
+
+        if self.key is None:
+            self.key = Key(*level.key) 
+            self.door = Door(*level.door) 
+        else:
+            self.key.reset(*level.key)
+            self.door.reset(*level.door)
+
+        self.camera.world_width = level.width
+        if self.pursuit and (self.navigation is None or self.navigation.level is not level):
+            self.navigation = self._navigation_graph(level)
+        self.enemy_batch = None
+        self.previous_positions = None
+        if self.timestep is not None:
+            self.timestep.reset()
+        self._stream_world()
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
+
+    def _navigation_graph(self, level):
+        # Edges follow the enemies' own physics, read off a pooled enemy.
+        probe = self.pools["enemy"].acquire(0, 0, 0, 0)
+        graph = NavigationGraph(level, probe.chase_speed, probe.gravity, probe.jump_strength,
+                                probe.actor.width, probe.actor.height)
+        self.pools["enemy"].release(probe)
+        return graph
+
+    def _stream_world(self):
+        """Follow the player with the camera and load the chunks around it."""
+        self.camera.follow(self.player.x_position)
+        if self.world.window_at(self.camera.x) == self.world.window:
+            return
+        # Streaming hands pooled enemies new identities; don't draw them sliding there.
+        self.previous_positions = None
+        # The batch arrays hold the enemy state; the world reads it off the objects.
+        if self.enemy_batch is not None:
+            self.enemy_batch.sync()
+        self.world.stream(self.camera.x)
+        if self.batch_enemies:
+            self.enemy_batch = EnemyBatch(self.active_enemies, self.platforms)
+
+        loaded = {chunk.layer_key: chunk for chunk in self.world.chunks if chunk.loaded}
+        for key in [key for key in self.static_layers if key not in loaded]:
+            del self.static_layers[key]
+        for chunk in loaded.values():
+            self._chunk_layer(chunk)
+
+    def _chunk_layer(self, chunk):
+        """The platforms overlapping `chunk` baked onto one surface, built once per layout."""
+        if chunk.layer_key not in self.static_layers:
+            actors = [self.world.live_platforms[index][0].actor for index in chunk.platforms]
+            self.static_layers[chunk.layer_key] = self.backend.make_static_layer(
+                actors, chunk.left, self.world.chunk_width)
+        return self.static_layers[chunk.layer_key]
+
+    def _visible_layers(self):
+        """(layer, screen x) for the chunks in view, or None without static layers."""
+        layers = []
+        for chunk in self.world.chunks_in_view(self.camera.x):
+            layer = self._chunk_layer(chunk)
+            if layer is None:
+                return None
+            layers.append((layer, chunk.left - self.camera.x))
+        return layers
+
+    def _draw_background(self, screen, layers):
+        for layer, x in layers:
+            screen.blit(layer, (x, 0))
+
+    def toggle_music(self):
+        self.music_on = not self.music_on
+        if self.music_on:
+            self.backend.music.unpause()
+            self.music_button.actor.image = "menu/button_music_on"
+        else:
+            self.backend.music.pause()
+            self.music_button.actor.image = "menu/button_music_off"
+
+    def exit_game(self):
+        self.backend.exit()
+
+    def lose_life(self):
+        if not self.player.invulnerable: 
+            self.total_lives -= 1 
+            self.backend.audio.play("hit_sound")
+            self.player.invulnerable = True
+            self.invulnerable_until = self.sim_time + self.player.invulnerability_duration
+
+            if self.total_lives <= 0:
+                self.game_over()
+
+    def _reset_invulnerability(self):
+        if self.player:
+            self.player.invulnerable = False
+            self.player.actor.image_alpha = 255
+
+    def level_complete(self):
+        self.game_state = GAME_STATE_LEVEL_COMPLETE
+        self.backend.audio.play("level_up_sound")
+        self.backend.music.pause() 
+
+    def game_over(self):
+        self.game_state = GAME_STATE_GAME_OVER
+        self.backend.audio.play("game_over_sound")
+        self.backend.music.pause()
+
+    def return_to_menu(self):
+        self.game_state = GAME_STATE_MENU
+        self.backend.music.unpause()
+
+        self.player = None
+
+    def update(self, frame_time):
+        self.profiler.begin_frame()
+        allocations = self.allocations
+        if allocations is not None:
+            allocations.begin("update")
+        self.scene.update(frame_time)
+        self.backend.audio.flush()
+        if allocations is not None:
+            allocations.end("update")
+
+    def _simulate(self, frame_time):
+        profiler = self.profiler
+        self.sim_time += frame_time
+        if self.player.invulnerable and self.sim_time >= self.invulnerable_until:
+            self._reset_invulnerability()
+
+        with profiler.scope("player"):
+            platforms = self.platform_grid.query(self.player.actor, self.player.fall_distance(frame_time))
+            self.player.update(frame_time, platforms, self.backend.keyboard)
+
+        navigation = self.navigation
+        with profiler.scope("enemies"):
+            if navigation is not None:
+                navigation.track(self.player)
+            if self.enemy_batch is not None:
+                if self.enemy_batch.update(frame_time, self.player) and not self.player.invulnerable:
+                    self.lose_life()
+            elif self.ai_scheduler is not None:
+                if self.ai_scheduler.update(self.active_enemies, frame_time, self.player, self.platform_grid,
+                                            self.camera, navigation) and not self.player.invulnerable:
+                    self.lose_life()
+            else:
+                for enemy in self.active_enemies:
+                    platforms = self.platform_grid.query(enemy.actor, enemy.fall_distance(frame_time))
+                    enemy.update(frame_time, self.player, platforms, navigation)
+                    if overlaps(self.player.actor, enemy.actor) and not self.player.invulnerable:
+                        self.lose_life()
+
+        with profiler.scope("pickups"):
+            self._update_pickups()
+
+        self._stream_world()
+
+    def _save_previous_positions(self):
+        """Remember where the player and enemies are before the frame's last step.
+
+        The sprites only change when streaming or a reset drops
+        `previous_positions`, so the same lists are refilled every frame.
+        """
+        sprites = self.interpolated_sprites
+        # The batch keeps enemy positions in its arrays; those are drawn as simulated.
+        enemies = self.active_enemies if self.enemy_batch is None else ()
+        if self.previous_positions is None or len(sprites) != len(enemies) + 1:
+            sprites[:] = [self.player, *enemies]
+            self.position_buffer[:] = [0.0] * (2 * len(sprites))
+            self.simulated_positions[:] = [0.0] * (2 * len(sprites) + 1)
+        positions = self.position_buffer
+        index = 0
+        for sprite in sprites:
+            positions[index] = sprite.x_position
+            positions[index + 1] = sprite.y_position
+            index += 2
+        self.previous_positions = positions
+
+    def _interpolate(self):
+        """Move actors and camera part way from the previous step to the current one, for drawing."""
+        positions = self.previous_positions
+        if positions is None:
+            return False
+        alpha = self.timestep.alpha
+        simulated = self.simulated_positions
+        index = 0
+        for sprite in self.interpolated_sprites:
+            actor = sprite.actor
+            # The rect's own edges put it back exactly, where pos would round.
+            simulated[index] = actor.left
+            simulated[index + 1] = actor.top
+            x = positions[index]
+            y = positions[index + 1]
+            actor.pos = (x + (sprite.x_position - x) * alpha, y + (sprite.y_position - y) * alpha)
+            index += 2
+        simulated[index] = self.camera.x
+        player_x = positions[0]
+        self.camera.follow(player_x + (self.player.x_position - player_x) * alpha)
+        return True
+
+    def _end_interpolation(self):
+        """Put back what `_interpolate` moved, so the simulation never sees drawn positions."""
+        simulated = self.simulated_positions
+        index = 0
+        for sprite in self.interpolated_sprites:
+            actor = sprite.actor
+            actor.left = simulated[index]
+            actor.top = simulated[index + 1]
+            index += 2
+        self.camera.x = simulated[index]
+
+    def _update_pickups(self):
+        if self.player.y_position > HEIGHT + 100 and not self.player.invulnerable:
+            self.lose_life()
+            if self.game_state == GAME_STATE_PLAYING: 
+                self.previous_positions = None
+                self.player.x_position, self.player.y_position = self.player_start
+                self.player.velocity_y = 0
+                self.player.is_jumping = False
+                self.player.on_ground = False
+                self.player.have_key = False
+
+        for coin in self.coin_grid.query(self.player.actor):
+            if overlaps(self.player.actor, coin.actor):
+                self.backend.audio.play("coin_sound")
+                self.player.score += 10
+                self.world.remove_coin(coin)
+
+        if not self.key.collected and overlaps(self.player.actor, self.key.actor):
+            self.key.collected = True
+            self.player.have_key = True
+            self.backend.audio.play("key_sound")
+
+        self.show_door_message = False 
+        if overlaps(self.player.actor, self.door.actor):
+            self.show_door_message = True 
+            
+            if self.backend.keyboard.f:
+                if not self.door.is_open:
+                    if self.player.have_key: 
+                        self.door.open_door()
+                        self.level_complete()
+                            
+    def _hud_labels(self):
+        entries = self.hud_entries
+        entries[0][1] = self.player.score
+        entries[1][1] = 'SIM' if self.player.have_key else 'NÃO'
+        entries[2][1] = self.total_lives
+        return entries if self.show_door_message else self.hud_entries_without_door
+
+    def draw(self):
+        # A static scene's last frame is still on screen until something changes.
+        if self.idle:
+            return
+        self.scene.needs_redraw = False
+        allocations = self.allocations
+        if allocations is not None:
+            allocations.begin("draw")
+        interpolated = self.game_state == GAME_STATE_PLAYING and self._interpolate()
+        self._draw()
+        if interpolated:
+            self._end_interpolation()
+        if allocations is not None:
+            allocations.end("draw")
+
+    def _draw(self):
+        screen = self.backend.screen
+        profiler = self.profiler
+
+        layers = self._visible_layers() if self.game_state == GAME_STATE_PLAYING else None
+
+        renderer = self.dirty_renderer
+        if renderer is not None:
+            if layers is not None:
+                if profiler.show_overlay:
+                    self._refresh_profiler_overlay()
+                with profiler.scope("platforms"):
+                    partial = renderer.collect()
+                if partial:
+                    with profiler.scope("sprites"):
+                        renderer.redraw(screen, layers)
+                    profiler.end_frame()
+                    return
+            else:
+                renderer.invalidate()
+
+        with profiler.scope("platforms"):
+            if layers is not None:
+                self._draw_background(screen, layers)
+            else:
+                screen.clear()
+                screen.fill(BLACK) 
+                if self.game_state == GAME_STATE_PLAYING:
+                    for platform in self.platforms:
+                        platform.draw(self.camera.x)
+
+        self.scene.draw(screen)
+
+        profiler.end_frame()
+        if profiler.show_overlay:
+            self._refresh_profiler_overlay()
+            self._draw_profiler_overlay(screen)
+
+    def _refresh_profiler_overlay(self):
+        if self.profiler_overlay is None or self.profiler.frame % 15 == 0:
+            self.profiler_overlay = self.backend.render_text(self.profiler.report(), 18, WHITE)
+
+    def _draw_profiler_overlay(self, screen):
+        if self.profiler_overlay is not None:
+            screen.blit(self.profiler_overlay, (WIDTH - self.profiler_overlay.get_width() - 10, 10))
+
+    def quick_save(self):
+        """Keep a snapshot of the level in progress, and write it to `save_path` if set."""
+        self.quick_save_slot = snapshot.capture(self)
+        if self.save_path is not None:
+            with open(self.save_path, "wb") as save_file:
+                save_file.write(self.quick_save_slot)
+
+    def quick_load(self):
+        """Go back to the last quick save, from this session or from `save_path`."""
+        data = self.quick_save_slot
+        if data is None and self.save_path is not None and os.path.exists(self.save_path):
+            with open(self.save_path, "rb") as save_file:
+                data = save_file.read()
+        if data is None:
+            return False
+        was_playing = self.game_state == GAME_STATE_PLAYING
+        snapshot.restore(self, data)
+        if not was_playing and self.music_on:
+            self.backend.music.unpause()
+        if self.on_restore is not None:
+            self.on_restore(data)
+        return True
+
+    def on_mouse_down(self, pos):
+        self.scene.needs_redraw = True
+        self.scene.on_mouse_down(pos)
+
+    def on_key_down(self, key):
+        self.scene.needs_redraw = True
+        if key == self.backend.keys.F3:
+            self.profiler.toggle_overlay()
+            self.profiler_overlay = None
+
+        self.scene.on_key_down(key)
@@ -0,0 +1,199 @@
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from array import array
+
+from . import backends
+from .entities import Player, Enemy
+from .levels import LevelData, LevelError
+from .navigation import NavigationGraph
+from .settings import WIDTH, HEIGHT
+
+GROUND = "tilesets/platform"
+LEDGE = "tilesets/platform_two"
+# Rows of ledges above the ground, and how far apart their tops are: a
+# little less than the player's jump, as in level 1.
+TIERS = 5
+TIER_SPACING = 120
+# Per screen at density 1, roughly level 1's counts.
+COINS_PER_SCREEN = 7
+ENEMIES_PER_SCREEN = 5
+GAP_CHANCE = 0.15
+# No enemy is placed on a surface starting this close to the player's start.
+START_CLEARANCE = 400
+COIN_LIFT = 33
+KEY_LIFT = 10
+
+
+class Layout:
+    """A level being generated: its platforms, coins and enemies, and the surfaces things stand on.
+
+    `surfaces` are (left, right, top, tier) runs of touching blocks.
+    """
+
+    def __init__(self):
+        self.platforms = array("d")
+        self.platform_images = array("H")
+        self.coins = array("d")
+        self.enemies = array("d")
+        self.surfaces = []
+
+    def add_run(self, image, x, y, count, size, tier):
+        width, height = size
+        for block in range(count):
+            self.platforms.extend((x + block * width + width / 2, y + height / 2))
+            self.platform_images.append(image)
+        self.surfaces.append((x, x + count * width, y, tier))
+
+
+def generate(seed, width=WIDTH * 3, density=1.0, attempts=20):
+    """A level `width` wide laid out from `seed`, with the key and door reachable from the start.
+
+    The ground is a row of `GROUND` blocks with the odd gap, under `TIERS`
+    rows of `LEDGE` runs; `density` scales how many ledges, coins and
+    enemies there are. Enemies patrol the surface they stand on. The key
+    goes on one of the top two rows and the door at the far end of the
+    ground. Reachability is checked on a `NavigationGraph` built with the
+    player's speed, jump and gravity; a layout that fails it is redrawn,
+    up to `attempts` times. Sizes and physics are read off the sprites, so
+    a backend must be active.
+    """
+    player = Player(0, 0)
+    enemy = Enemy(0, 0, 0, 0)
+    for attempt in range(attempts):
+        rng = random.Random(f"{seed}:{attempt}")
+        level, key_surface, door_surface = _layout(rng, width, density, player, enemy)
+        if _reachable(level, player, key_surface, door_surface):
+            return level
+    raise LevelError(f"no layout with a reachable key and door for seed {seed} in {attempts} attempts")
+
+
+def _layout(rng, width, density, player, enemy):
+    image_size = backends.active.image_size
+    ground_size = image_size(GROUND)
+    ledge_size = image_size(LEDGE)
+    layout = Layout()
+
+    # Ground: never a gap under the start or the door, nor two in a row.
+    ground_width, ground_height = ground_size
+    ground_top = HEIGHT - ground_height
+    columns = math.ceil(width / ground_width)
+    run_start = 0
+    gap_chance = min(GAP_CHANCE * density, 0.3)
+    for column in range(columns + 1):
+        gap = (column == columns or
+               (2 <= column < columns - 2 and column > run_start and rng.random() < gap_chance))
+        if gap:
+            layout.add_run(0, run_start * ground_width, ground_top, column - run_start, ground_size, 0)
+            run_start = column + 1
+
+    ledge_width, ledge_height = ledge_size
+    for tier in range(1, TIERS + 1):
+        top = ground_top - tier * TIER_SPACING
+        x = rng.uniform(0, ledge_width)
+        while x + ledge_width <= width:
+            count = min(rng.randint(1, 3), int((width - x) // ledge_width))
+            layout.add_run(1, x, top, count, ledge_size, tier)
+            x += count * ledge_width + rng.uniform(0.5, 2.0) * ledge_width / density
+
+    screens = width / WIDTH
+    surfaces = layout.surfaces
+    coin_width = image_size("coin")[0]
+    for _ in range(round(COINS_PER_SCREEN * screens * density)):
+        left, right, top, tier = rng.choice(surfaces)
+        layout.coins.extend((rng.uniform(left + coin_width / 2, right - coin_width / 2), top - COIN_LIFT))
+
+    enemy_width = enemy.actor.width
+    enemy_height = enemy.actor.height
+    patrols = [surface for surface in surfaces
+               if surface[1] - surface[0] >= 2 * enemy_width and surface[0] >= START_CLEARANCE]
+    for _ in range(round(ENEMIES_PER_SCREEN * screens * density) if patrols else 0):
+        left, right, top, tier = rng.choice(patrols)
+        patrol_min = left + enemy_width / 2
+        patrol_max = right - enemy_width / 2
+        layout.enemies.extend((rng.uniform(patrol_min, patrol_max), top - enemy_height / 2, patrol_min, patrol_max))
+
+    key_width, key_height = image_size("key")
+    high = [surface for surface in surfaces if surface[3] >= TIERS - 1] or surfaces
+    left, right, key_top, tier = rng.choice(high)
+    key = (rng.uniform(left + key_width / 2, right - key_width / 2), key_top - KEY_LIFT - key_height / 2)
+
+    door_width, door_height = image_size("door_closed")
+    door = (width - ground_width + door_width / 2, ground_top - door_height / 2)
+    start = (ground_width / 2, ground_top - player.actor.height / 2)
+
+    level = LevelData([GROUND, LEDGE], layout.platforms, layout.platform_images, layout.coins, layout.enemies,
+                      key, door, start, float(width))
+    return level, (key[0], key_top), (door[0], ground_top)
+
+
+def _reachable(level, player, key_surface, door_surface):
+    """Whether the player can get from the start to the key, and from there to the door."""
+    graph = NavigationGraph(level, player.speed, player.gravity, player.jump_strength,
+                            player.actor.width, player.actor.height)
+    start = graph.surface_at(level.player[0], level.player[1] + player.actor.height / 2)
+    key = graph.surface_at(*key_surface)
+    door = graph.surface_at(*door_surface)
+    if start is None or key is None or door is None:
+        return False
+    return key in _reached(start) and door in _reached(key)
+
+
+def _reached(source):
+    reached = {source}
+    pending = [source]
+    while pending:
+        for edge in pending.pop().edges:
+            if edge.target not in reached:
+                reached.add(edge.target)
+                pending.append(edge.target)
+    return reached
+
+
+class GeneratedLevels:
+    """A `Game` level loader that generates level n from `seed` + n - 1 instead of reading a file.
+
+    It keeps its arguments so a recording can generate the same levels again.
+    """
+
+    def __init__(self, seed, width=WIDTH * 3, density=1.0):
+        self.seed = seed
+        self.width = width
+        self.density = density
+
+    def __call__(self, level_number):
+        return generate(self.seed + level_number - 1, self.width, self.density)
+
+
+def level_loader(seed, width=WIDTH * 3, density=1.0):
+    return GeneratedLevels(seed, width, density)
+
+
+def main(argv=None):
+    from .headless import HeadlessBackend
+
+    parser = argparse.ArgumentParser(prog="python -m setorzero.generator",
+                                     description="Generate a level with a reachable key and door.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--screens", type=float, default=3.0, help="level width in screens")
+    parser.add_argument("--density", type=float, default=1.0, help="ledges, coins and enemies relative to level 1")
+    parser.add_argument("--out", metavar="PATH", help="write the level as JSON, e.g. levels/level_2.json")
+    args = parser.parse_args(argv)
+
+    backends.use(HeadlessBackend())
+    start = time.perf_counter()
+    level = generate(args.seed, round(args.screens * WIDTH), args.density)
+    elapsed = time.perf_counter() - start
+    print(f"seed {args.seed}: {len(level.platforms) // 2} platforms, {len(level.coins) // 2} coins, "
+          f"{len(level.enemies) // 4} enemies in {elapsed * 1e3:.1f} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as level_file:
+            json.dump(level.to_dict(), level_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import os
+import struct
+
+from pgzero.clock import Clock
+from pgzero.constants import keys
+from pgzero.rect import ZRect
+
+from .settings import ROOT, WIDTH, GAME_STATE_PLAYING
+
+_image_sizes = {}
+
+
+def image_size(name):
+    """Read an image's size from its PNG header, without pygame.image."""
+    size = _image_sizes.get(name)
+    if size is None:
+        with open(os.path.join(ROOT, "images", name + ".png"), "rb") as image_file:
+            header = image_file.read(24)
+        size = struct.unpack(">II", header[16:24])
+        _image_sizes[name] = size
+    return size
+
+
+class RectActor:
+    """Center-anchored rect with the parts of the `Actor` API the game uses.
+
+    Geometry matches `pgzero.actor.Actor` exactly, so collisions give the
+    same results as in a window, but nothing is ever loaded or drawn.
+    """
+
+    DELEGATED_ATTRIBUTES = frozenset(a for a in dir(ZRect) if not a.startswith("_"))
+
+    def __init__(self, image, pos=(0, 0)):
+        self.__dict__["_rect"] = ZRect((0, 0), (0, 0))
+        self.__dict__["_anchor"] = (0, 0)
+        self.flip_x = False
+        self.image_alpha = 255
+        self.image = image
+        self.pos = pos
+
+    def __getattr__(self, attr):
+        if attr in RectActor.DELEGATED_ATTRIBUTES:
+            return getattr(self._rect, attr)
+        raise AttributeError(attr)
+
+    def __setattr__(self, attr, value):
+        if attr in RectActor.DELEGATED_ATTRIBUTES:
+            setattr(self._rect, attr, value)
+        else:
+            object.__setattr__(self, attr, value)
+
+    def __iter__(self):
+        return iter(self._rect)
+
+    # Collision tests read these every frame; as properties they skip
+    # __getattr__ and ZRect's own properties.
+    @property
+    def left(self):
+        return self._rect.x
+
+    @property
+    def right(self):
+        rect = self._rect
+        return rect.x + rect.w
+
+    @property
+    def top(self):
+        return self._rect.y
+
+    @property
+    def bottom(self):
+        rect = self._rect
+        return rect.y + rect.h
+
+    @property
+    def width(self):
+        return self._rect.w
+
+    @property
+    def height(self):
+        return self._rect.h
+
+    @property
+    def pos(self):
+        px, py = self._rect.topleft
+        ax, ay = self._anchor
+        return px + ax, py + ay
+
+    @pos.setter
+    def pos(self, pos):
+        px, py = pos
+        ax, ay = self._anchor
+        self._rect.topleft = px - ax, py - ay
+
+    @property
+    def x(self):
+        return self._rect.left + self._anchor[0]
+
+    @x.setter
+    def x(self, px):
+        self._rect.left = px - self._anchor[0]
+
+    @property
+    def y(self):
+        return self._rect.top + self._anchor[1]
+
+    @y.setter
+    def y(self, py):
+        self._rect.top = py - self._anchor[1]
+
+    @property
+    def image(self):
+        return self._image_name
+
+    @image.setter
+    def image(self, image):
+        pos = self.pos
+        self._image_name = image
+        width, height = image_size(image)
+        self._rect.size = (width, height)
+        self.__dict__["_anchor"] = (width / 2, height / 2)
+        self.pos = pos
+
+    def colliderect(self, other):
+        if isinstance(other, RectActor):
+            other = other._rect
+        elif not isinstance(other, ZRect):
+            return self._rect.colliderect(other)
+        rect = self._rect
+        return (
+            rect.x < other.x + other.w and
+            rect.y < other.y + other.h and
+            rect.x + rect.w > other.x and
+            rect.y + rect.h > other.y
+        )
+
+    def draw(self):
+        pass
+
+
+class ScriptedKeyboard:
+    """Keyboard whose keys are set by a bot, a replay or a test."""
+
+    def __init__(self):
+        self.pressed = set()
+
+    def press(self, *names):
+        self.pressed.update(names)
+
+    def release(self, *names):
+        self.pressed.difference_update(names)
+
+    def set(self, names):
+        self.pressed = set(names)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return name in self.pressed
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+class NullPainter:
+    def __getattr__(self, name):
+        return _ignore
+
+
+class NullScreen:
+    draw = NullPainter()
+
+    def clear(self):
+        pass
+
+    def fill(self, color):
+        pass
+
+    def blit(self, image, pos):
+        pass
+
+
+class NullSound:
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+
+class NullSounds:
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return NullSound()
+
+
+class NullAudio:
+    def play(self, name):
+        pass
+
+    def flush(self):
+        pass
+
+    def report(self):
+        return "audio: disabled"
+
+
+class NullMusic:
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _ignore
+
+
+class HeadlessBackend:
+    """Runs the game without a display, audio device or real-time clock."""
+
+    Actor = RectActor
+    keys = keys
+
+    def __init__(self, keyboard=None):
+        self.keyboard = keyboard if keyboard is not None else ScriptedKeyboard()
+        self.screen = NullScreen()
+        self.sounds = NullSounds()
+        self.audio = NullAudio()
+        self.music = NullMusic()
+        self.clock = Clock()
+        self.images = None
+
+    def make_static_layer(self, actors, origin_x=0, width=WIDTH):
+        return None
+
+    def image_size(self, name):
+        return image_size(name)
+
+    def draw_frame(self, frames, frame, actor, offset_x=0):
+        pass
+
+    def draw_actor(self, actor, offset_x=0):
+        pass
+
+    def render_text(self, text, fontsize, color):
+        return None
+
+    def idle(self, timeout):
+        return 0.0
+
+    def exit(self):
+        raise SystemExit
+
+
+def step(game, frame_time):
+    game.backend.clock.tick(frame_time)
+    game.update(frame_time)
+
+
+def run(game, frames, frame_time=1 / 60, policy=None):
+    """Step `game` for `frames` fixed-length frames as fast as possible.
+
+    `policy(game, frame)` is called before each frame and may change the
+    pressed keys; stepping stops early if the game leaves the playing state.
+    """
+    for frame in range(frames):
+        if game.game_state != GAME_STATE_PLAYING:
+            return frame
+        if policy is not None:
+            policy(game, frame)
+        step(game, frame_time)
+    return frames
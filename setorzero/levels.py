@@ -0,0 +1,194 @@
+import json
+import os
+import struct
+from array import array
+
+from .settings import ROOT, WIDTH
+
+LEVELS_DIR = os.path.join(ROOT, "levels")
+
+FORMAT_VERSION = 1
+CACHE_MAGIC = b"SZLV"
+CACHE_VERSION = 2
+
+# magic, cache version, image count, source mtime_ns, source size,
+# platform count, coin count, enemy count, padded so the arrays that follow
+# stay 8-byte aligned
+_HEADER = struct.Struct("<4sHHqqIII4x")
+# key, door, player positions and the level width
+_POINTS = struct.Struct("<7d")
+
+
+class LevelError(Exception):
+    pass
+
+
+class LevelData:
+    """A level compiled to flat arrays.
+
+    `platforms` holds x, y pairs and `platform_images` the matching index
+    into `images`; `coins` holds x, y pairs and `enemies` x, y, patrol_min,
+    patrol_max quadruples. `width` is the horizontal extent of the world,
+    which may be wider than the screen.
+    """
+
+    def __init__(self, images, platforms, platform_images, coins, enemies, key, door, player, width=WIDTH):
+        self.images = images
+        self.platforms = platforms
+        self.platform_images = platform_images
+        self.coins = coins
+        self.enemies = enemies
+        self.key = key
+        self.door = door
+        self.player = player
+        self.width = width
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != FORMAT_VERSION:
+            raise LevelError(f"unsupported level format version: {data.get('version')!r}")
+
+        images = []
+        platforms = array("d")
+        platform_images = array("H")
+        for platform in data["platforms"]:
+            image = platform.get("image", "tilesets/platform")
+            if image not in images:
+                images.append(image)
+            platforms.extend((platform["x"], platform["y"]))
+            platform_images.append(images.index(image))
+
+        coins = array("d")
+        for coin in data.get("coins", []):
+            coins.extend((coin["x"], coin["y"]))
+
+        enemies = array("d")
+        for enemy in data.get("enemies", []):
+            if enemy["patrol_min"] > enemy["patrol_max"]:
+                raise LevelError(f"enemy at x={enemy['x']} has patrol_min > patrol_max")
+            enemies.extend((enemy["x"], enemy["y"], enemy["patrol_min"], enemy["patrol_max"]))
+
+        def point(name):
+            return (float(data[name]["x"]), float(data[name]["y"]))
+
+        return cls(images, platforms, platform_images, coins, enemies,
+                   point("key"), point("door"), point("player"), float(data.get("width", WIDTH)))
+
+    def to_dict(self):
+        """The level in the JSON file format `from_dict` reads."""
+        platforms = self.platforms
+        coins = self.coins
+        enemies = self.enemies
+        return {
+            "version": FORMAT_VERSION,
+            "width": self.width,
+            "player": {"x": self.player[0], "y": self.player[1]},
+            "platforms": [{"image": self.images[image_index], "x": platforms[2 * index], "y": platforms[2 * index + 1]}
+                          for index, image_index in enumerate(self.platform_images)],
+            "coins": [{"x": coins[index], "y": coins[index + 1]} for index in range(0, len(coins), 2)],
+            "enemies": [{"x": enemies[index], "y": enemies[index + 1],
+                         "patrol_min": enemies[index + 2], "patrol_max": enemies[index + 3]}
+                        for index in range(0, len(enemies), 4)],
+            "key": {"x": self.key[0], "y": self.key[1]},
+            "door": {"x": self.door[0], "y": self.door[1]},
+        }
+
+    def to_bytes(self, source_mtime_ns=0, source_size=0):
+        platform_images = array("H", self.platform_images)
+        if len(platform_images) % 4:
+            platform_images.extend([0] * (4 - len(platform_images) % 4))
+        names = b"".join(struct.pack("<H", len(encoded)) + encoded
+                         for encoded in (image.encode("utf-8") for image in self.images))
+        return b"".join((
+            _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(self.images), source_mtime_ns, source_size,
+                         len(self.platforms) // 2, len(self.coins) // 2, len(self.enemies) // 4),
+            _POINTS.pack(*self.key, *self.door, *self.player, self.width),
+            array("d", self.platforms).tobytes(),
+            array("d", self.coins).tobytes(),
+            array("d", self.enemies).tobytes(),
+            platform_images.tobytes(),
+            names,
+        ))
+
+    @classmethod
+    def from_bytes(cls, buffer, source_mtime_ns=None, source_size=None):
+        """Rebuild a level from `to_bytes` output.
+
+        Returns None when the buffer is from another cache version or, if
+        given, a different source file.
+        """
+        if len(buffer) < _HEADER.size + _POINTS.size:
+            return None
+        magic, version, image_count, mtime_ns, size, platform_count, coin_count, enemy_count = \
+            _HEADER.unpack_from(buffer)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            return None
+        if source_mtime_ns is not None and (mtime_ns, size) != (source_mtime_ns, source_size):
+            return None
+
+        offset = _HEADER.size
+        points = _POINTS.unpack_from(buffer, offset)
+        offset += _POINTS.size
+
+        def take(typecode, count):
+            nonlocal offset
+            values = array(typecode)
+            end = offset + count * values.itemsize
+            values.frombytes(buffer[offset:end])
+            offset = end
+            return values
+
+        platforms = take("d", platform_count * 2)
+        coins = take("d", coin_count * 2)
+        enemies = take("d", enemy_count * 4)
+        platform_images = take("H", platform_count + (-platform_count % 4))[:platform_count]
+
+        images = []
+        for _ in range(image_count):
+            (length,) = struct.unpack_from("<H", buffer, offset)
+            offset += 2
+            images.append(bytes(buffer[offset:offset + length]).decode("utf-8"))
+            offset += length
+
+        return cls(images, platforms, platform_images, coins, enemies,
+                   points[0:2], points[2:4], points[4:6], points[6])
+
+
+def level_path(level_number):
+    return os.path.join(LEVELS_DIR, f"level_{level_number}.json")
+
+
+def load(level_number):
+    return load_file(level_path(level_number))
+
+
+def load_file(path):
+    """Load a level JSON file, going through its binary cache when it is fresh."""
+    stat = os.stat(path)
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "__cache__")
+    cache_path = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + ".bin")
+
+    try:
+        with open(cache_path, "rb") as cache_file:
+            level = LevelData.from_bytes(cache_file.read(), stat.st_mtime_ns, stat.st_size)
+        if level is not None:
+            return level
+    except OSError:
+        pass
+
+    with open(path, encoding="utf-8") as level_file:
+        try:
+            level = LevelData.from_dict(json.load(level_file))
+        except (KeyError, TypeError, ValueError) as error:
+            raise LevelError(f"invalid level file {path}: {error}") from error
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(level.to_bytes(stat.st_mtime_ns, stat.st_size))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+    return level
@@ -0,0 +1,251 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from .profiler import RingBuffer
+from .settings import GAME_STATE_PLAYING
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PHASES = ("update", "draw")
+
+
+class GCMonitor:
+    """Collections per generation and how long each one paused the game, via `gc.callbacks`."""
+
+    def __init__(self, window=240):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.collections = [0, 0, 0]
+        self.collected = 0
+        self.pauses = RingBuffer(self.window)
+        self.started = 0.0
+
+    def start(self):
+        gc.callbacks.append(self._callback)
+
+    def stop(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self.started = time.perf_counter()
+            return
+        self.pauses.append(time.perf_counter() - self.started)
+        self.collections[info["generation"]] += 1
+        self.collected += info["collected"]
+
+    def report(self):
+        mean, p95, p99, longest = self.pauses.stats()
+        return (f"gc: {self.collections[0]}/{self.collections[1]}/{self.collections[2]} collections "
+                f"(gen 0/1/2), {self.collected} objects freed, pause mean {mean * 1e3:.2f} ms, "
+                f"max {longest * 1e3:.2f} ms")
+
+
+class AllocationTracker:
+    """Memory that `Game.update` and `Game.draw` leave allocated, by the line that allocated it.
+
+    Each sampled phase is bracketed by tracemalloc snapshots, with the
+    tracker's own traces filtered out, and the second is compared to the
+    first by line: blocks and bytes a line gained are what the phase kept
+    there. Only the innermost frame is traced, so memory pgzero allocates
+    for the game is charged to the line in pgzero that allocated it, and an
+    object replaced by one allocated elsewhere counts at its new site.
+    Memory freed before the phase returns never shows in a snapshot and
+    only raises the phase's peak, reported apart with the net change.
+    Retained objects are what drive the garbage collector: a frame that
+    keeps none never triggers a collection.
+
+    A pair of snapshots costs tens of milliseconds, so only one frame in
+    `interval` is measured; the GC figures cover every frame.
+    """
+
+    def __init__(self, depth=1, interval=10):
+        self.depth = depth
+        self.interval = interval
+        self.gc = GCMonitor()
+        self.ticks = 0
+        self.sampling = False
+        self.before = None
+        self.start_size = 0
+        self.running = False
+        self.filters = (tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__))
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.blocks = dict.fromkeys(PHASES, 0)
+        self.size = dict.fromkeys(PHASES, 0)
+        self.peak = dict.fromkeys(PHASES, 0)
+        self.net = dict.fromkeys(PHASES, 0)
+        # (file, line, phase) -> [kept blocks, kept bytes]
+        self.sites = {}
+        self.gc.reset()
+
+    def start(self):
+        tracemalloc.start(self.depth)
+        self.gc.start()
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        self.gc.stop()
+        tracemalloc.stop()
+
+    def begin(self, phase):
+        if not self.running:
+            return
+        if phase == PHASES[0]:
+            self.sampling = self.ticks % self.interval == 0
+            self.ticks += 1
+        if not self.sampling:
+            return
+        with _collector_off():
+            self.before = tracemalloc.take_snapshot().filter_traces(self.filters)
+        # Taken last, so the snapshot above is not charged to the phase.
+        self.start_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def end(self, phase):
+        if self.before is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak[phase] = max(self.peak[phase], peak - self.start_size)
+        self.net[phase] += current - self.start_size
+        with _collector_off():
+            after = tracemalloc.take_snapshot().filter_traces(self.filters)
+            for diff in after.compare_to(self.before, "lineno"):
+                if diff.count_diff <= 0 and diff.size_diff <= 0:
+                    continue
+                frame = diff.traceback[0]
+                blocks = max(diff.count_diff, 0)
+                size = max(diff.size_diff, 0)
+                self.blocks[phase] += blocks
+                self.size[phase] += size
+                totals = self.sites.setdefault((frame.filename, frame.lineno, phase), [0, 0])
+                totals[0] += blocks
+                totals[1] += size
+            del after
+            self.before = None
+        if phase == PHASES[0]:
+            self.frames += 1
+
+    def report(self, limit=10):
+        frames = self.frames or 1
+        lines = [f"kept per frame, over {self.frames} measured frames:"]
+        for phase in PHASES:
+            lines.append(f"  {phase:<28}{self.blocks[phase] / frames:6.1f} blocks {self.size[phase] / frames:7.0f} B"
+                         f"   net {self.net[phase] / frames:+.0f} B   peak {self.peak[phase]} B")
+        top = sorted(self.sites.items(), key=lambda item: (-item[1][1], -item[1][0]))[:limit]
+        for (filename, lineno, phase), (blocks, size) in top:
+            if filename.startswith(PACKAGE_DIR):
+                filename = os.path.relpath(filename, PACKAGE_DIR)
+            else:
+                filename = os.path.basename(filename)
+            site = f"{filename}:{lineno} ({phase})"
+            lines.append(f"    {site:<26}{blocks / frames:6.1f} blocks {size / frames:7.0f} B")
+        lines.append(self.gc.report())
+        return "\n".join(lines)
+
+
+@contextmanager
+def _collector_off():
+    """Keep the tracker's own temporaries from triggering collections.
+
+    They are all freed by the end of the block, which takes them back off
+    the collector's allocation count, so gameplay sees the count it would
+    have had without the tracker.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class GCScheduler:
+    """Keeps the cycle collector out of gameplay, collecting at state transitions instead.
+
+    `pause` (entering play) collects, moves every surviving object out of
+    the collector's sight with `gc.freeze` and turns automatic collection
+    off; `resume` (leaving play) undoes that and collects again, behind a
+    static screen. Should gameplay leave more than `limit` container
+    objects alive regardless, the youngest generation is collected anyway
+    and counted in `forced`.
+    """
+
+    def __init__(self, limit=50000):
+        self.limit = limit
+        self.paused = False
+        self.forced = 0
+        self.enabled_before = True
+
+    def pause(self):
+        if self.paused:
+            return
+        self.enabled_before = gc.isenabled()
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        self.paused = True
+
+    def resume(self):
+        if not self.paused:
+            return
+        gc.unfreeze()
+        if self.enabled_before:
+            gc.enable()
+        gc.collect()
+        self.paused = False
+
+    def tick(self):
+        if self.paused and gc.get_count()[0] > self.limit:
+            gc.collect(0)
+            self.forced += 1
+
+
+def main(argv=None):
+    from .benchmark import offscreen_backend, scripted_input
+    from .game import Game
+
+    parser = argparse.ArgumentParser(prog="python -m setorzero.memory",
+                                     description="Report what a gameplay frame allocates and how often GC runs.")
+    parser.add_argument("--frames", type=int, default=600, help="frames measured after the warmup")
+    parser.add_argument("--warmup", type=int, default=60, help="frames run before measuring, to fill caches")
+    parser.add_argument("--interval", type=int, default=10, help="measure allocations every N frames")
+    parser.add_argument("--tuned-gc", action="store_true", help="only collect garbage between levels")
+    args = parser.parse_args(argv)
+
+    backend = offscreen_backend()
+    game = Game(backend, track_allocations=True, tuned_gc=args.tuned_gc)
+    game.allocations.interval = args.interval
+    game.start_game()
+    start = time.perf_counter()
+    for frame in range(args.warmup + args.frames):
+        if frame == args.warmup:
+            game.allocations.reset()
+        # Dying would leave gameplay; keep the run in the level.
+        if game.game_state != GAME_STATE_PLAYING:
+            game.total_lives = 3
+            game.game_state = GAME_STATE_PLAYING
+        scripted_input(backend.keyboard, frame)
+        game.update(1 / 60)
+        game.draw()
+    game.allocations.stop()
+    print(game.allocations.report())
+    if game.gc_scheduler is not None:
+        print(f"tuned gc: {game.gc_scheduler.forced} forced collections")
+    print(f"{args.warmup + args.frames} frames in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+import bisect
+import heapq
+import math
+from collections import OrderedDict
+
+from . import backends
+from .settings import HEIGHT
+
+WALK, DROP, JUMP = range(3)
+# How far a sprite's feet may be from a surface and still stand on it: the
+# animation frames differ in height by a couple of pixels.
+FOOTING = 3
+
+
+class Surface:
+    """The top of a run of platforms at the same height, walkable end to end."""
+
+    __slots__ = ("index", "left", "right", "top", "bottom", "edges")
+
+    def __init__(self, index, left, right, top, bottom):
+        self.index = index
+        self.left = left
+        self.right = right
+        self.top = top
+        self.bottom = bottom
+        self.edges = []
+
+
+class Edge:
+    """A way from one surface to `target`: walk to `take_off`, then go `direction` (or jump)."""
+
+    __slots__ = ("target", "kind", "take_off", "direction", "cost")
+
+    def __init__(self, target, kind, take_off, direction, cost):
+        self.target = target
+        self.kind = kind
+        self.take_off = take_off
+        self.direction = direction
+        self.cost = cost
+
+
+class NavigationGraph:
+    """Surfaces of a level and how an enemy can get from one to another.
+
+    Platforms touching at the same height are merged into one surface, and
+    walk edges cross gaps narrower than the enemy. Drop edges follow an
+    enemy walking off an end at `speed` to the first surface it lands on.
+    Jump edges go to surfaces a jump of `jump_strength` reaches, taking off
+    far enough out that the enemy is level with the target when it comes
+    alongside, since it bumps its head on a platform it jumps into from
+    below. Costs are seconds of travel.
+
+    Enemies whose route to the player's surface costs less than
+    `pursuit_cost` follow it, whatever the height difference, since they no
+    longer need to be on the player's floor; an enemy in the air is judged
+    from the surface below it, and one further across than `pursuit_cost`
+    of walking never is. Routes are computed per target surface, once,
+    as the next edge to take and the cost from every other surface, so every
+    enemy chasing the player shares one search until the player reaches
+    another surface. The last `cache_size` targets are kept, least recently
+    used first out.
+    """
+
+    def __init__(self, level, speed, gravity, jump_strength, width, height, pursuit_cost=6.0, cache_size=32):
+        self.level = level
+        self.speed = speed
+        self.gravity = gravity
+        self.jump_strength = jump_strength
+        self.half_width = width / 2
+        self.height = height
+        self.surfaces = self._merge(level)
+        # top -> surfaces at that height, for finding what a sprite stands on
+        self.rows = {}
+        for surface in self.surfaces:
+            self.rows.setdefault(surface.top, []).append(surface)
+        self.tops = sorted(self.rows)
+        # Surfaces by left end, so each one's neighbours are found without a scan.
+        self.by_left = sorted(self.surfaces, key=lambda surface: surface.left)
+        self.lefts = [surface.left for surface in self.by_left]
+        self.widest = max((surface.right - surface.left for surface in self.surfaces), default=0)
+        for surface in self.surfaces:
+            self._link(surface)
+        # target index -> (surface, edge) of every edge into it, for searching backwards
+        self.incoming = [[] for _ in self.surfaces]
+        for surface in self.surfaces:
+            for edge in surface.edges:
+                self.incoming[edge.target.index].append((surface, edge))
+
+        self.pursuit_cost = pursuit_cost
+        self.cache_size = cache_size
+        self.routes = OrderedDict()
+        self.target = None
+        self.hits = 0
+        self.misses = 0
+
+    def _merge(self, level):
+        platforms = level.platforms
+        rects = []
+        sizes = {}
+        for index, image_index in enumerate(level.platform_images):
+            image = level.images[image_index]
+            if image not in sizes:
+                sizes[image] = backends.active.image_size(image)
+            width, height = sizes[image]
+            x = platforms[2 * index]
+            y = platforms[2 * index + 1]
+            rects.append((y - height / 2, x - width / 2, x + width / 2, y + height / 2))
+        rects.sort()
+
+        surfaces = []
+        for top, left, right, bottom in rects:
+            last = surfaces[-1] if surfaces else None
+            if last is not None and abs(last.top - top) < 0.5 and left <= last.right + 1:
+                last.right = max(last.right, right)
+                last.bottom = max(last.bottom, bottom)
+            else:
+                surfaces.append(Surface(len(surfaces), left, right, top, bottom))
+        return surfaces
+
+    def _link(self, source):
+        half_width = self.half_width
+        speed = self.speed
+        launch = -self.jump_strength
+        rise_time = launch / self.gravity
+        middle = (source.left + source.right) / 2
+        # Nothing further than the longest possible flight can be reached.
+        reach = speed * (rise_time + math.sqrt(2 * (HEIGHT + launch * rise_time) / self.gravity)) + half_width
+        first = bisect.bisect_left(self.lefts, source.left - reach - self.widest)
+        last = bisect.bisect_left(self.lefts, source.right + reach)
+        nearby = [surface for surface in self.by_left[first:last] if surface.right + reach > source.left]
+        # Ties go to the first surface found, so keep the order they were merged in.
+        nearby.sort(key=lambda surface: surface.index)
+
+        # Gaps narrower than the enemy are walked over: it always overlaps one side.
+        for target in nearby:
+            if target is source or abs(target.top - source.top) >= 0.5:
+                continue
+            if 0 <= target.left - source.right < 2 * half_width:
+                source.edges.append(Edge(target, WALK, target.left, 1, (target.left - middle) / speed))
+            elif 0 <= source.left - target.right < 2 * half_width:
+                source.edges.append(Edge(target, WALK, target.right, -1, (middle - target.right) / speed))
+
+        # Walking off either end, to wherever the fall comes down.
+        for direction, end in ((1, source.right), (-1, source.left)):
+            take_off = end + direction * (half_width + 1)
+            landing, air_time = self._first_landing(nearby, source, take_off, direction, 0)
+            if landing is not None and landing is not source:
+                source.edges.append(Edge(landing, DROP, take_off, direction,
+                                         abs(take_off - middle) / speed + air_time))
+
+        # Jumps: across a gap from the near end, or onto a surface overhead from
+        # the side, arriving as the jump tops out, since the enemy bumps its head
+        # on a platform it jumps into from below.
+        for target in nearby:
+            if target is source:
+                continue
+            if target.left >= source.right:
+                direction, take_off = 1, source.right
+            elif target.right <= source.left:
+                direction, take_off = -1, source.left
+            elif target.top < source.top:
+                lead = half_width + speed * rise_time
+                if target.right + lead <= source.right:
+                    direction, take_off = -1, target.right + lead
+                elif target.left - lead >= source.left:
+                    direction, take_off = 1, target.left - lead
+                else:
+                    continue
+            else:
+                continue
+            landing, air_time = self._first_landing(nearby, source, take_off, direction, launch)
+            if landing is target:
+                source.edges.append(Edge(target, JUMP, take_off, direction,
+                                         abs(take_off - middle) / speed + air_time))
+
+    def _first_landing(self, surfaces, source, take_off, direction, launch):
+        """Surface a sprite leaving `source` at `take_off` comes down on, and after how long."""
+        landing = None
+        first = math.inf
+        for surface in surfaces:
+            time = self._landing_time(source, surface, take_off, direction, launch, first)
+            if time is not None and time < first:
+                landing, first = surface, time
+        return landing, first
+
+    def _landing_time(self, source, target, take_off, direction, launch, before=math.inf):
+        """When a sprite leaving `source` at `take_off` with upward speed `launch` lands on `target`.
+
+        It lands once it is falling with its feet inside the platform and
+        its rect over it; it keeps moving `direction` at `speed` throughout.
+        Landings no sooner than `before` are not worked out.
+        """
+        near = (target.left - self.half_width - take_off) * direction
+        far = (target.right + self.half_width - take_off) * direction
+        if near > far:
+            near, far = far, near
+        # Behind the sprite, or not over it until after `before`: the cheap checks first.
+        if far <= 0 or near / self.speed >= before:
+            return None
+
+        gravity = self.gravity
+        apex_time = launch / gravity
+        apex = launch * apex_time / 2
+        top_rise = source.top - target.top
+        bottom_rise = source.top - target.bottom
+        if apex <= bottom_rise:
+            return None
+        first = apex_time + math.sqrt(2 * max(apex - top_rise, 0) / gravity)
+        last = apex_time + math.sqrt(2 * (apex - bottom_rise) / gravity)
+
+        enter = max(near / self.speed, first)
+        leave = min(far / self.speed, last)
+        return enter if enter < leave else None
+
+    def surface_at(self, x, bottom):
+        """The surface a sprite with its feet at `bottom` is standing on, or None."""
+        half_width = self.half_width
+        tops = self.tops
+        index = bisect.bisect_left(tops, bottom - FOOTING)
+        while index < len(tops) and tops[index] <= bottom + FOOTING:
+            for surface in self.rows[tops[index]]:
+                if surface.left - half_width < x < surface.right + half_width:
+                    return surface
+            index += 1
+        return None
+
+    def surface_below(self, x, bottom):
+        """The first surface at or below feet at `bottom`, or None if there is nothing to land on."""
+        half_width = self.half_width
+        tops = self.tops
+        index = bisect.bisect_left(tops, bottom - FOOTING)
+        while index < len(tops):
+            for surface in self.rows[tops[index]]:
+                if surface.left - half_width < x < surface.right + half_width:
+                    return surface
+            index += 1
+        return None
+
+    def track(self, player):
+        """Remember the surface the player last stood on as the target to route to."""
+        # on_ground alternates while standing, as landing is tested before the actor moves.
+        if player.velocity_y >= 0:
+            surface = self.surface_at(player.x_position, player.actor.bottom)
+            if surface is not None:
+                self.target = surface
+
+    def next_edge(self, source, target):
+        """First edge of the fastest way from `source` to `target`, or None if there is none."""
+        return self._routes(target)[0][source.index]
+
+    def pursues(self, enemy, dx):
+        """Whether `enemy`, `dx` from the player, can reach the player's surface within `pursuit_cost`."""
+        target = self.target
+        if target is None:
+            return False
+        x = enemy.x_position
+        speed = self.speed
+        # Enemies always move sideways at `speed`, so no route beats walking straight there.
+        if abs(dx) >= self.pursuit_cost * speed:
+            return False
+        source = self.surface_below(x, enemy.actor.bottom)
+        if source is None:
+            return False
+        if source is target:
+            return True
+        routes, cost = self._routes(target)
+        edge = routes[source.index]
+        if edge is None:
+            return False
+        # Edge costs are walked from the middle of their surface; start from where the enemy is.
+        middle = (source.left + source.right) / 2
+        walk = abs(edge.take_off - x) - abs(edge.take_off - middle)
+        return cost[source.index] + walk / speed < self.pursuit_cost
+
+    def _routes(self, target):
+        routes = self.routes.get(target.index)
+        if routes is None:
+            self.misses += 1
+            routes = self.routes[target.index] = self._route(target)
+            if len(self.routes) > self.cache_size:
+                self.routes.popitem(last=False)
+        else:
+            self.hits += 1
+            self.routes.move_to_end(target.index)
+        return routes
+
+    def _route(self, target):
+        """Dijkstra backwards from `target`: the next edge to take from every surface and what getting there costs."""
+        incoming = self.incoming
+        cost = [math.inf] * len(self.surfaces)
+        routes = [None] * len(self.surfaces)
+        cost[target.index] = 0.0
+        queue = [(0.0, target.index)]
+        while queue:
+            distance, index = heapq.heappop(queue)
+            if distance > cost[index]:
+                continue
+            for surface, edge in incoming[index]:
+                candidate = distance + edge.cost
+                if candidate < cost[surface.index]:
+                    cost[surface.index] = candidate
+                    routes[surface.index] = edge
+                    heapq.heappush(queue, (candidate, surface.index))
+        return routes, cost
+
+    def steer(self, enemy, dx):
+        """Where a pursuing `enemy` should head instead of straight at the player, `dx` away.
+
+        Returns the horizontal offset to move along; at a jump's take-off
+        point the enemy is also launched.
+        """
+        target = self.target
+        if target is None:
+            return dx
+        source = self.surface_at(enemy.x_position, enemy.actor.bottom) if enemy.velocity_y >= 0 else None
+        if source is None:
+            # Committed to a drop or jump: keep going the way it was headed.
+            return 1 if enemy.facing_right else -1
+        if source is target:
+            return dx
+        edge = self.next_edge(source, target)
+        if edge is None:
+            return dx
+
+        offset = edge.take_off - enemy.x_position
+        if edge.kind == JUMP:
+            if abs(offset) <= 4:
+                enemy.velocity_y = enemy.jump_strength
+                return edge.direction
+            return offset
+        # Walk up to the edge, then on past it.
+        return offset if offset * edge.direction > 0 else edge.direction
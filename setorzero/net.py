@@ -0,0 +1,748 @@
+import argparse
+import random
+import selectors
+import socket
+import struct
+import sys
+import time
+
+from .entities import Enemy
+from .headless import HeadlessBackend, ScriptedKeyboard, step
+from .pool import Pool
+from .profiler import RingBuffer
+from .replay import KEY_NAMES, key_mask, key_names
+from .settings import GAME_STATE_PLAYING, GAME_STATE_LEVEL_COMPLETE, GAME_STATE_GAME_OVER, GAME_STATE_LOADING
+
+MAGIC = b"SZNT"
+VERSION = 1
+
+HOST = "127.0.0.1"
+PORT = 7777
+TICK_RATE = 60
+# Positions are sent in 1/QUANTUM of a pixel.
+QUANTUM = 4
+# Past states kept to encode deltas against; a client further behind gets a full state.
+HISTORY = 2 * TICK_RATE
+# Unsent bytes after which a peer is too far behind to catch up and is dropped.
+MAX_OUTBOX = 1 << 20
+
+VIEWER, PLAYER = range(2)
+
+# Every message is a length and a kind byte followed by its body.
+_LENGTH = struct.Struct("<I")
+HELLO, WELCOME, INPUT, STATE = b"H", b"W", b"I", b"S"
+# magic, version, role
+_HELLO = struct.Struct("<4sHB")
+# client id, tick rate
+_WELCOME = struct.Struct("<HH")
+# last tick received, key mask
+_INPUT = struct.Struct("<IH")
+# tick, tick the delta is against (0: against the empty state)
+_STATE = struct.Struct("<II")
+_FIELD_MASK = struct.Struct("<H")
+
+FIELDS = ("level", "game_state", "lives", "score", "have_key", "key_collected", "door_open", "door_message",
+          "player_x", "player_y", "player_frame", "invulnerable")
+SPACE = 1 << KEY_NAMES.index("space")
+
+
+class NetError(Exception):
+    pass
+
+
+class WorldState:
+    """What clients see of one tick: quantized and small enough to diff cheaply.
+
+    `fields` follows `FIELDS`, `enemies` holds (x, y, frame) of every loaded
+    enemy and `coins` is a bit set of the level's coins still in play,
+    indexed by their order in the level file.
+    """
+
+    __slots__ = ("tick", "fields", "enemies", "coins")
+
+    def __init__(self, tick, fields, enemies, coins):
+        self.tick = tick
+        self.fields = fields
+        self.enemies = enemies
+        self.coins = coins
+
+    def __eq__(self, other):
+        return (self.fields, self.enemies, self.coins) == (other.fields, other.enemies, other.coins)
+
+
+EMPTY = WorldState(0, (0,) * len(FIELDS), (), 0)
+
+
+def coin_indexes(level):
+    """(x, y) -> index of every coin in `level`; coins are told apart by where they are."""
+    coins = level.coins
+    return {(coins[index], coins[index + 1]): index // 2 for index in range(0, len(coins), 2)}
+
+
+def capture_state(game, tick, coin_index):
+    player = game.player
+    fields = (game.level_number or 0, game.game_state, game.total_lives, player.score, player.have_key,
+              game.key.collected, game.door.is_open, game.show_door_message,
+              round(player.x_position * QUANTUM), round(player.y_position * QUANTUM), player.frame,
+              player.invulnerable)
+    if game.enemy_batch is not None:
+        game.enemy_batch.sync()
+    enemies = tuple((round(enemy.x_position * QUANTUM), round(enemy.y_position * QUANTUM), enemy.frame)
+                    for enemy in game.enemies)
+    coins = 0
+    for chunk in game.world.chunks:
+        if chunk.loaded:
+            for coin in chunk.live_coins:
+                if coin.slot != -1:
+                    coins |= 1 << coin_index[(coin.x_position, coin.y_position)]
+        else:
+            for position in chunk.coins:
+                coins |= 1 << coin_index[position]
+    return WorldState(tick, tuple(int(value) for value in fields), enemies, coins)
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _write_signed(out, value):
+    _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _read_signed(data, offset):
+    value, offset = _read_varint(data, offset)
+    return (value >> 1) ^ -(value & 1), offset
+
+
+def encode_delta(state, baseline):
+    """`state` as the differences from `baseline`.
+
+    Changed fields are flagged in a bit mask and sent as zigzag varints of
+    the difference, so a player walking costs a byte or two per axis.
+    Enemies are diffed by position in the list, the changed ones sent as
+    gaps between their indexes plus a mask of which of x, y and frame
+    changed. Coins are sent as the indexes whose bit flipped: collected
+    ones, or every coin after a restart.
+    """
+    out = bytearray()
+    mask = 0
+    changes = []
+    for index, (value, base) in enumerate(zip(state.fields, baseline.fields)):
+        if value != base:
+            mask |= 1 << index
+            changes.append(value - base)
+    out += _FIELD_MASK.pack(mask)
+    for change in changes:
+        _write_signed(out, change)
+
+    enemies = state.enemies
+    base_enemies = baseline.enemies
+    _write_varint(out, len(enemies))
+    changed = []
+    for index, enemy in enumerate(enemies):
+        base = base_enemies[index] if index < len(base_enemies) else (0, 0, 0)
+        if enemy != base:
+            changed.append((index, enemy, base))
+    _write_varint(out, len(changed))
+    previous = 0
+    for index, enemy, base in changed:
+        _write_varint(out, index - previous)
+        previous = index
+        mask = 0
+        for bit in range(3):
+            if enemy[bit] != base[bit]:
+                mask |= 1 << bit
+        out.append(mask)
+        for bit in range(3):
+            if mask & 1 << bit:
+                _write_signed(out, enemy[bit] - base[bit])
+
+    flipped = state.coins ^ baseline.coins
+    _write_varint(out, bin(flipped).count("1"))
+    previous = 0
+    while flipped:
+        lowest = flipped & -flipped
+        index = lowest.bit_length() - 1
+        _write_varint(out, index - previous)
+        previous = index
+        flipped ^= lowest
+    return bytes(out)
+
+
+def decode_delta(data, offset, tick, baseline):
+    (mask,) = _FIELD_MASK.unpack_from(data, offset)
+    offset += _FIELD_MASK.size
+    fields = list(baseline.fields)
+    for index in range(len(fields)):
+        if mask & 1 << index:
+            change, offset = _read_signed(data, offset)
+            fields[index] += change
+
+    count, offset = _read_varint(data, offset)
+    base_enemies = baseline.enemies
+    enemies = list(base_enemies[:count])
+    enemies.extend((0, 0, 0) for _ in range(count - len(enemies)))
+    changed, offset = _read_varint(data, offset)
+    index = 0
+    for _ in range(changed):
+        gap, offset = _read_varint(data, offset)
+        index += gap
+        mask = data[offset]
+        offset += 1
+        enemy = list(enemies[index])
+        for bit in range(3):
+            if mask & 1 << bit:
+                change, offset = _read_signed(data, offset)
+                enemy[bit] += change
+        enemies[index] = tuple(enemy)
+
+    coins = baseline.coins
+    flipped, offset = _read_varint(data, offset)
+    index = 0
+    for _ in range(flipped):
+        gap, offset = _read_varint(data, offset)
+        index += gap
+        coins ^= 1 << index
+    if offset != len(data):
+        raise NetError("corrupt state message")
+    return WorldState(tick, tuple(fields), tuple(enemies), coins)
+
+
+class _Connection:
+    """Length-prefixed messages over a non-blocking socket."""
+
+    def __init__(self, sock):
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.closed = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def send(self, kind, body):
+        self.outbox += _LENGTH.pack(len(body) + 1)
+        self.outbox += kind
+        self.outbox += body
+        self.flush()
+        if len(self.outbox) > MAX_OUTBOX:
+            self.closed = True
+
+    def flush(self):
+        if not self.outbox or self.closed:
+            return
+        try:
+            sent = self.sock.send(self.outbox)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.closed = True
+            return
+        self.bytes_sent += sent
+        del self.outbox[:sent]
+
+    def receive(self):
+        """Every complete message that has arrived, as (kind, body)."""
+        while not self.closed:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""
+            if not data:
+                self.closed = True
+                break
+            self.inbox += data
+            self.bytes_received += len(data)
+
+        messages = []
+        inbox = self.inbox
+        offset = 0
+        while len(inbox) - offset >= _LENGTH.size:
+            (length,) = _LENGTH.unpack_from(inbox, offset)
+            end = offset + _LENGTH.size + length
+            if end > len(inbox):
+                break
+            start = offset + _LENGTH.size
+            messages.append((bytes(inbox[start:start + 1]), bytes(inbox[start + 1:end])))
+            offset = end
+        del inbox[:offset]
+        return messages
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+class _RemoteClient:
+    def __init__(self, client_id, connection, role):
+        self.id = client_id
+        self.connection = connection
+        self.role = role
+        self.keys = 0
+        self.acked = 0
+
+
+class Server:
+    """Runs one `Game` headless at a fixed tick for clients on local sockets.
+
+    Each tick the key masks of every connected player are combined into the
+    keyboard of the game's only player, the game is stepped once and its
+    `WorldState` is sent to every client as a delta against the last tick
+    that client acknowledged, or against the empty state if it has not
+    acknowledged one still in `history`. Viewers receive the same states
+    but their keys are ignored. On the end screens a player pressing SPACE
+    restarts the level directly, as there is no menu to go back to.
+
+    `bytes_per_tick` and `encode_times` sample what every tick cost to
+    serialize and send to all clients.
+    """
+
+    def __init__(self, host=HOST, port=PORT, tick_rate=TICK_RATE, game=None):
+        if game is None:
+            from .game import Game
+            game = Game(HeadlessBackend())
+        self.game = game
+        if game.game_state != GAME_STATE_PLAYING:
+            game.start_game()
+        self.tick_rate = tick_rate
+        self.step = 1 / tick_rate
+        self.tick_count = 0
+        self.history = {}
+        self.coin_level = None
+        self.coin_index = None
+        self.keys = 0
+
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients = {}
+        self.next_id = 1
+
+        self.bytes_per_tick = RingBuffer(1024)
+        self.encode_times = RingBuffer(1024)
+        self.full_states = 0
+        self.delta_states = 0
+        self.bytes_sent = 0
+
+    @property
+    def address(self):
+        return self.listener.getsockname()[:2]
+
+    def _poll_sockets(self):
+        for key, _ in self.selector.select(0):
+            if key.fileobj is self.listener:
+                self._accept()
+            else:
+                self._read(key.data)
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            connection = _Connection(sock)
+            # Not a client until it says hello.
+            self.selector.register(sock, selectors.EVENT_READ, _RemoteClient(0, connection, VIEWER))
+
+    def _read(self, client):
+        for kind, body in client.connection.receive():
+            try:
+                if kind == INPUT and client.id:
+                    acked, keys = _INPUT.unpack(body)
+                elif kind == HELLO and not client.id:
+                    magic, version, role = _HELLO.unpack(body)
+                else:
+                    continue
+            except struct.error:
+                # A malformed message only costs the client that sent it.
+                client.connection.closed = True
+                break
+            if kind == INPUT:
+                client.acked = max(client.acked, acked)
+                if client.role == PLAYER:
+                    client.keys = keys
+            elif magic != MAGIC or version != VERSION or role not in (PLAYER, VIEWER):
+                client.connection.closed = True
+                break
+            else:
+                client.id = self.next_id
+                client.role = role
+                self.next_id += 1
+                self.clients[client.id] = client
+                client.connection.send(WELCOME, _WELCOME.pack(client.id, self.tick_rate))
+        if client.connection.closed:
+            self._drop(client)
+
+    def _drop(self, client):
+        self.selector.unregister(client.connection.sock)
+        client.connection.close()
+        self.clients.pop(client.id, None)
+
+    def tick(self):
+        """Read inputs, step the game once and send every client its delta."""
+        self._poll_sockets()
+        game = self.game
+
+        keys = 0
+        for client in self.clients.values():
+            keys |= client.keys
+        pressed = keys & ~self.keys
+        self.keys = keys
+        if game.game_state in (GAME_STATE_LEVEL_COMPLETE, GAME_STATE_GAME_OVER) and pressed & SPACE:
+            self._restart()
+        game.backend.keyboard.set(key_names(keys))
+        step(game, self.step)
+
+        self.tick_count += 1
+        if game.world.level is not self.coin_level:
+            self.coin_level = game.world.level
+            self.coin_index = coin_indexes(self.coin_level)
+        state = capture_state(game, self.tick_count, self.coin_index)
+        self.history[self.tick_count] = state
+
+        start = time.perf_counter()
+        sent = 0
+        encoded = {}
+        for client in list(self.clients.values()):
+            baseline = self.history.get(client.acked, EMPTY)
+            message = encoded.get(baseline.tick)
+            if message is None:
+                message = encoded[baseline.tick] = (_STATE.pack(state.tick, baseline.tick)
+                                                    + encode_delta(state, baseline))
+            if baseline is EMPTY:
+                self.full_states += 1
+            else:
+                self.delta_states += 1
+            client.connection.send(STATE, message)
+            sent += len(message) + _LENGTH.size + 1
+            if client.connection.closed:
+                self._drop(client)
+        self.encode_times.append(time.perf_counter() - start)
+        self.bytes_per_tick.append(sent)
+        self.bytes_sent += sent
+
+        oldest = min((client.acked for client in self.clients.values()), default=self.tick_count)
+        oldest = max(oldest, self.tick_count - HISTORY)
+        for tick in [tick for tick in self.history if tick < oldest]:
+            del self.history[tick]
+        return state
+
+    def _restart(self):
+        game = self.game
+        # A fresh player, as going back to the menu gives, so the score
+        # starts over with the coins.
+        game.player = None
+        game.total_lives = 3
+        game.sim_time = 0.0
+        game.invulnerable_until = 0.0
+        game._setup_level(game.world.level)
+        game.game_state = GAME_STATE_PLAYING
+
+    def serve_forever(self, seconds=None):
+        """Tick in real time, for `seconds` or until interrupted."""
+        started = next_tick = time.perf_counter()
+        while seconds is None or next_tick - started < seconds:
+            self.tick()
+            next_tick += self.step
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -5 * self.step:
+                # Too far behind to catch up; carry on from now.
+                next_tick = time.perf_counter()
+
+    def report(self):
+        mean_bytes, _, _, peak_bytes = self.bytes_per_tick.stats()
+        mean, _, p99, peak = self.encode_times.stats()
+        return (f"server: {self.next_id - 1} clients served, tick {self.tick_count} at {self.tick_rate} Hz; "
+                f"sent mean {mean_bytes:.0f} / max {peak_bytes:.0f} bytes per tick "
+                f"({mean_bytes * self.tick_rate * 8 / 1000:.1f} kbit/s); "
+                f"encode mean {mean * 1e6:.0f} us / p99 {p99 * 1e6:.0f} us / max {peak * 1e6:.0f} us; "
+                f"{self.full_states} full states, {self.delta_states} deltas")
+
+    def close(self):
+        for client in list(self.clients.values()):
+            self._drop(client)
+        self.selector.close()
+        self.listener.close()
+
+
+class Client:
+    """A connection to a `Server` that rebuilds its states from the deltas.
+
+    Connecting does not wait for the server: `id` is set, and states
+    start arriving, once it has ticked. `poll` returns the newest state
+    received, if any, and acknowledges it with the current key mask so the
+    server can diff against it next.
+    """
+
+    def __init__(self, address, role=PLAYER, timeout=5.0):
+        sock = socket.create_connection(address, timeout)
+        self.connection = _Connection(sock)
+        self.role = role
+        self.keys = 0
+        self.acked = 0
+        self.state = None
+        self.states = {0: EMPTY}
+        self.decode_times = RingBuffer(1024)
+
+        self.id = None
+        self.tick_rate = None
+        self.connection.send(HELLO, _HELLO.pack(MAGIC, VERSION, role))
+
+    def send_input(self, keys):
+        if keys != self.keys:
+            self.keys = keys
+            self._send_input()
+
+    def _send_input(self):
+        self.connection.send(INPUT, _INPUT.pack(self.acked, self.keys))
+
+    def poll(self):
+        received = False
+        for kind, body in self.connection.receive():
+            if kind == STATE:
+                self._apply(body)
+                received = True
+            elif kind == WELCOME:
+                self.id, self.tick_rate = _WELCOME.unpack(body)
+        if self.connection.closed:
+            raise NetError("server closed the connection")
+        if received:
+            self._send_input()
+            return self.state
+        self.connection.flush()
+        return None
+
+    def _apply(self, body):
+        start = time.perf_counter()
+        tick, base = _STATE.unpack_from(body)
+        baseline = self.states.get(base)
+        if baseline is None:
+            raise NetError(f"state {tick} is a delta against unknown state {base}")
+        state = decode_delta(body, _STATE.size, tick, baseline)
+        # The server never diffs against anything older than what it was sent last.
+        for old in [old for old in self.states if 0 < old < base]:
+            del self.states[old]
+        self.states[tick] = state
+        self.state = state
+        self.acked = tick
+        self.decode_times.append(time.perf_counter() - start)
+
+    def report(self):
+        mean, _, p99, _ = self.decode_times.stats()
+        return (f"client {self.id}: {self.connection.bytes_received} bytes received, "
+                f"decode mean {mean * 1e6:.0f} us / p99 {p99 * 1e6:.0f} us")
+
+    def close(self):
+        self.connection.close()
+
+
+class RemoteView:
+    """Shows a `Client`'s states through a local `Game`'s regular drawing code.
+
+    The game is never updated; each new state is written onto its player,
+    key, door and counters, its world is streamed around the player as
+    usual, coins the server has collected are taken out, and enemies are
+    drawn from a list of puppets rather than the world's own. Sounds are
+    played for what changed between states.
+    """
+
+    def __init__(self, game, client):
+        self.game = game
+        self.client = client
+        self.puppets = []
+        self.puppet_pool = Pool(Enemy)
+        self.coin_index = None
+        self.state = None
+
+    def update(self, frame_time):
+        game = self.game
+        if self.client.role == PLAYER:
+            self.client.send_input(key_mask(game.backend.keyboard))
+        state = self.client.poll()
+        if game.game_state == GAME_STATE_LOADING:
+            game.update(frame_time)
+        elif state is not None or self.state is not self.client.state:
+            self.apply(self.client.state)
+        game.backend.audio.flush()
+
+    def apply(self, state):
+        game = self.game
+        (level_number, game_state, lives, score, have_key, key_collected, door_open, door_message,
+         x, y, frame, invulnerable) = state.fields
+        previous = self.state
+        self.state = state
+        if not level_number:
+            return
+
+        # A restart puts collected coins, the key and the door back, so the
+        # level is set up again.
+        restarted = previous is not None and (
+            state.coins & ~previous.coins or score < previous.fields[3]
+            or (previous.fields[5] and not key_collected) or (previous.fields[6] and not door_open))
+        if game.world is None or game.level_number != level_number or restarted:
+            level = game._level_data(level_number)
+            game._setup_level(level)
+            self.coin_index = coin_indexes(level)
+            previous = None
+
+        audio = game.backend.audio
+        if previous is not None:
+            old_fields = previous.fields
+            if score > old_fields[3]:
+                audio.play("coin_sound")
+            if lives < old_fields[2]:
+                audio.play("hit_sound")
+            if key_collected and not old_fields[5]:
+                audio.play("key_sound")
+            if game_state != old_fields[1]:
+                if game_state == GAME_STATE_LEVEL_COMPLETE:
+                    audio.play("level_up_sound")
+                elif game_state == GAME_STATE_GAME_OVER:
+                    audio.play("game_over_sound")
+
+        game.game_state = game_state
+        game.total_lives = lives
+        game.show_door_message = bool(door_message)
+        game.key.collected = bool(key_collected)
+        if door_open and not game.door.is_open:
+            game.door.open_door()
+
+        player = game.player
+        player.score = score
+        player.have_key = bool(have_key)
+        player.invulnerable = bool(invulnerable)
+        player.x_position = x / QUANTUM
+        player.y_position = y / QUANTUM
+        player.frame = frame
+        player.image = player.frames.names[frame]
+        player.actor.image = player.image
+        player.actor.pos = (player.x_position, player.y_position)
+        game._stream_world()
+
+        coins = state.coins
+        coin_index = self.coin_index
+        for coin in [coin for coin in game.coins
+                     if not coins >> coin_index[(coin.x_position, coin.y_position)] & 1]:
+            game.world.remove_coin(coin)
+
+        puppets = self.puppets
+        while len(puppets) > len(state.enemies):
+            self.puppet_pool.release(puppets.pop())
+        while len(puppets) < len(state.enemies):
+            puppets.append(self.puppet_pool.acquire(0, 0, 0, 0))
+        for puppet, (enemy_x, enemy_y, enemy_frame) in zip(puppets, state.enemies):
+            puppet.x_position = enemy_x / QUANTUM
+            puppet.y_position = enemy_y / QUANTUM
+            if puppet.frame != enemy_frame:
+                puppet.frame = enemy_frame
+                puppet.image = puppet.frames.names[enemy_frame]
+                puppet.actor.image = puppet.image
+            puppet.actor.pos = (puppet.x_position, puppet.y_position)
+        game.enemies = puppets
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or HOST, int(port)
+
+
+def bench(players=1, viewers=2, ticks=3600, tick_rate=TICK_RATE, seed=0):
+    """Run a server and its clients on loopback as fast as possible, with bots at the keys.
+
+    Returns the server and the number of states some client rebuilt
+    differently from what the server sent.
+    """
+    server = Server(port=0, tick_rate=tick_rate)
+    clients = ([Client(server.address, PLAYER) for _ in range(players)]
+               + [Client(server.address, VIEWER) for _ in range(viewers)])
+    rng = random.Random(seed)
+    keyboard = ScriptedKeyboard()
+    sent = {}
+    mismatches = 0
+    try:
+        for tick in range(ticks):
+            for index, client in enumerate(clients[:players]):
+                if (tick + index) % 15 == 0:
+                    keyboard.set(rng.choice((("right",), ("left",), ("right", "space"), ("left", "space"),
+                                             ("space",), ())) + ("f",))
+                    client.send_input(key_mask(keyboard))
+            state = server.tick()
+            sent[state.tick] = state
+            for client in clients:
+                received = client.poll()
+                if received is not None and received != sent[received.tick]:
+                    mismatches += 1
+            oldest = min(client.acked for client in clients)
+            for old in [old for old in sent if old < oldest]:
+                del sent[old]
+        return server, clients, mismatches
+    finally:
+        for client in clients:
+            client.close()
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m setorzero.net",
+                                     description="Run the game on a local server for remote viewers and players.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run a server in real time")
+    serve.add_argument("--host", default=HOST)
+    serve.add_argument("--port", type=int, default=PORT)
+    serve.add_argument("--tick-rate", type=int, default=TICK_RATE, metavar="HZ")
+    serve.add_argument("--seconds", type=float, default=None, help="stop after this long")
+    measure = commands.add_parser("bench", help="measure a server and bot clients over loopback")
+    measure.add_argument("--players", type=int, default=1)
+    measure.add_argument("--viewers", type=int, default=2)
+    measure.add_argument("--seconds", type=float, default=60.0, help="game time to simulate")
+    measure.add_argument("--tick-rate", type=int, default=TICK_RATE, metavar="HZ")
+    measure.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = Server(args.host, args.port, args.tick_rate)
+        host, port = server.address
+        print(f"serving on {host}:{port} at {args.tick_rate} Hz")
+        try:
+            server.serve_forever(args.seconds)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(server.report())
+            server.close()
+        return 0
+
+    start = time.perf_counter()
+    server, clients, mismatches = bench(args.players, args.viewers, int(args.seconds * args.tick_rate),
+                                        args.tick_rate, args.seed)
+    print(f"{server.tick_count} ticks in {time.perf_counter() - start:.2f}s")
+    print(server.report())
+    for client in clients:
+        print(client.report())
+    print("all states rebuilt exactly" if not mismatches else f"{mismatches} states rebuilt wrong")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+class Pool:
+    """Free list of entities that are reset and reused instead of reallocated.
+
+    `factory(*args)` builds a new entity; pooled ones are handed back through
+    their `reset(*args)`, which must leave them in the same state.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+
+    def acquire(self, *args):
+        if self.free:
+            item = self.free.pop()
+            item.reset(*args)
+            return item
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, item):
+        self.free.append(item)
+
+    def release_all(self, items):
+        self.free.extend(items)
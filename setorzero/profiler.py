@@ -0,0 +1,142 @@
+import csv
+import math
+import time
+from array import array
+
+PHASES = ("player", "enemies", "pickups", "platforms", "sprites", "hud")
+
+
+class RingBuffer:
+    """The last `size` samples of one phase, in a preallocated array."""
+
+    def __init__(self, size):
+        self.values = array("d", bytes(8 * size))
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def stats(self):
+        """(mean, p95, p99, max) of the buffered samples, in seconds."""
+        if not self.count:
+            return 0.0, 0.0, 0.0, 0.0
+        data = sorted(self.values[:self.count])
+        count = len(data)
+
+        def percentile(fraction):
+            return data[min(count - 1, max(0, math.ceil(fraction * count) - 1))]
+
+        return sum(data) / count, percentile(0.95), percentile(0.99), data[-1]
+
+
+class _NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.frame_times[self.name] += time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    """Named timing scopes around the phases of a frame.
+
+    While disabled, `scope` hands back one shared no-op context manager, so
+    the instrumentation costs a method call per phase and nothing else.
+
+    A frame runs from `begin_frame` to `end_frame`. The game opens one at
+    each update and closes it after drawing; a loop that only updates, or
+    a static screen that skips the draw, gets it closed by the next
+    `begin_frame` instead, so every update is one row.
+    """
+
+    def __init__(self, phases=PHASES, window=240):
+        self.phases = phases
+        self.enabled = False
+        self.show_overlay = False
+        self.frame_times = dict.fromkeys(phases, 0.0)
+        self.history = {phase: RingBuffer(window) for phase in phases}
+        self.totals = RingBuffer(window)
+        self.scopes = {phase: _Scope(self, phase) for phase in phases}
+        self.frame = 0
+        self.open = False
+        self.csv_file = None
+        self.csv_writer = None
+
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        return self.scopes[name]
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self.csv_writer is not None
+
+    def start_csv(self, path):
+        self.csv_file = open(path, "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(("frame",) + self.phases + ("total",))
+        self.enabled = True
+
+    def stop_csv(self):
+        self.end_frame()
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.csv_file = None
+        self.csv_writer = None
+        self.enabled = self.show_overlay
+
+    def begin_frame(self):
+        if self.open:
+            self.end_frame()
+        self.open = True
+
+    def end_frame(self):
+        if not self.open:
+            return
+        self.open = False
+        if not self.enabled:
+            return
+        frame_times = self.frame_times
+        total = 0.0
+        for phase in self.phases:
+            elapsed = frame_times[phase]
+            self.history[phase].append(elapsed)
+            total += elapsed
+        self.totals.append(total)
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([self.frame] + [f"{frame_times[phase] * 1e6:.1f}" for phase in self.phases]
+                                     + [f"{total * 1e6:.1f}"])
+        for phase in self.phases:
+            frame_times[phase] = 0.0
+        self.frame += 1
+
+    def report(self):
+        """One line per phase with mean/p95/p99/max in milliseconds."""
+        lines = [f"{'phase':<10}{'mean':>7}{'p95':>7}{'p99':>7}{'max':>7}"]
+        for name, buffer in list(self.history.items()) + [("total", self.totals)]:
+            mean, p95, p99, peak = buffer.stats()
+            lines.append(f"{name:<10}{mean * 1e3:7.2f}{p95 * 1e3:7.2f}{p99 * 1e3:7.2f}{peak * 1e3:7.2f}")
+        return "\n".join(lines)
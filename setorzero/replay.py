@@ -0,0 +1,266 @@
+import hashlib
+import struct
+import sys
+import time
+import zlib
+
+from . import snapshot
+from .settings import GAME_STATE_MENU, GAME_STATE_PLAYING
+
+KEY_NAMES = ("left", "right", "a", "d", "space", "w", "f")
+START_FLAG = 0x8000
+MENU_FLAG = 0x4000
+RESTORE_FLAG = 0x2000
+
+MAGIC = b"SZRP"
+VERSION = 5
+
+# Game options that change the simulation, as header flags.
+PURSUIT = 1
+AI_LOD = 2
+BATCH_ENEMIES = 4
+GENERATED = 8
+
+# magic, version, frame count, physics rate (0: steps follow frame_time), option flags,
+# and with GENERATED the generator's seed, level width and density
+_HEADER = struct.Struct("<4sHIHHqdd")
+# key mask (+ START_FLAG / MENU_FLAG / RESTORE_FLAG), frame_time, state hash
+_FRAME = struct.Struct("<Hd8s")
+# length of a restored snapshot, stored after the frames
+_RESTORE = struct.Struct("<I")
+
+
+def key_mask(keyboard):
+    mask = 0
+    for bit, name in enumerate(KEY_NAMES):
+        if getattr(keyboard, name):
+            mask |= 1 << bit
+    return mask
+
+
+def key_names(mask):
+    return [name for bit, name in enumerate(KEY_NAMES) if mask & (1 << bit)]
+
+
+def state_hash(game):
+    """8-byte digest of everything a replay has to reproduce exactly."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(struct.pack("<Bi", game.game_state, game.total_lives))
+    player = game.player
+    if player is None:
+        return digest.digest()
+
+    digest.update(struct.pack("<3d?i???", player.x_position, player.y_position, player.velocity_y,
+                              player.on_ground, player.score, player.have_key, player.invulnerable,
+                              player.facing_right))
+    if game.enemy_batch is not None:
+        game.enemy_batch.sync()
+    for enemy in game.enemies:
+        digest.update(struct.pack("<3d??", enemy.x_position, enemy.y_position, enemy.velocity_y,
+                                  enemy.facing_right, enemy.moving_to_max))
+    # Collecting coins reorders the list and restoring a snapshot rebuilds it
+    # chunk by chunk, so coins are hashed by position, not list order.
+    for position in sorted((coin.x_position, coin.y_position) for coin in game.coins):
+        digest.update(struct.pack("<2d", *position))
+    if game.key is not None and game.door is not None:
+        digest.update(struct.pack("<??", game.key.collected, game.door.is_open))
+    return digest.digest()
+
+
+class ReplayError(Exception):
+    pass
+
+
+class Recording:
+    """Per-frame inputs, frame times and state hashes of a play session.
+
+    `physics_rate`, the option flags and `generated` (the seed, width and
+    density of generated levels, or None for the level files) are the `Game`
+    options the session ran with that change the simulation; `game_options`
+    hands them back. `restores` holds the snapshot loaded on each frame
+    flagged with RESTORE_FLAG, in order.
+    """
+
+    def __init__(self, frames=None, physics_rate=0, options=0, generated=None, restores=None):
+        self.frames = frames if frames is not None else []
+        self.physics_rate = physics_rate
+        self.options = options
+        self.generated = generated
+        self.restores = restores if restores is not None else []
+
+    @classmethod
+    def for_game(cls, game):
+        from .generator import GeneratedLevels
+
+        options = ((PURSUIT if game.pursuit else 0) | (AI_LOD if game.ai_scheduler is not None else 0)
+                   | (BATCH_ENEMIES if game.batch_enemies else 0))
+        generated = None
+        loader = game.level_loader
+        if isinstance(loader, GeneratedLevels):
+            options |= GENERATED
+            generated = (loader.seed, loader.width, loader.density)
+        return cls(physics_rate=game.timestep.rate if game.timestep is not None else 0, options=options,
+                   generated=generated)
+
+    def game_options(self):
+        options = {
+            "physics_rate": self.physics_rate or None,
+            "pursuit": bool(self.options & PURSUIT),
+            "ai_lod": bool(self.options & AI_LOD),
+            "batch_enemies": bool(self.options & BATCH_ENEMIES),
+        }
+        if self.generated is not None:
+            from .generator import level_loader
+            options["level_loader"] = level_loader(*self.generated)
+        return options
+
+    def to_bytes(self):
+        body = b"".join(_FRAME.pack(*frame) for frame in self.frames)
+        body += b"".join(_RESTORE.pack(len(data)) + data for data in self.restores)
+        return (_HEADER.pack(MAGIC, VERSION, len(self.frames), self.physics_rate, self.options,
+                             *(self.generated or (0, 0.0, 0.0)))
+                + zlib.compress(body))
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, frame_count, physics_rate, options, seed, width, density = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("not a SetorZero recording")
+        if version != VERSION:
+            raise ReplayError(f"unsupported recording version: {version}")
+        body = zlib.decompress(data[_HEADER.size:])
+        offset = frame_count * _FRAME.size
+        if len(body) < offset:
+            raise ReplayError("truncated recording")
+        frames = list(_FRAME.iter_unpack(body[:offset]))
+        restores = []
+        for _ in range(sum(1 for frame in frames if frame[0] & RESTORE_FLAG)):
+            if len(body) < offset + _RESTORE.size:
+                raise ReplayError("truncated recording")
+            (length,) = _RESTORE.unpack_from(body, offset)
+            offset += _RESTORE.size
+            restores.append(body[offset:offset + length])
+            offset += length
+        if offset != len(body):
+            raise ReplayError("truncated recording")
+        generated = (seed, width, density) if options & GENERATED else None
+        return cls(frames, physics_rate, options, generated, restores)
+
+    def save(self, path):
+        with open(path, "wb") as recording_file:
+            recording_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as recording_file:
+            return cls.from_bytes(recording_file.read())
+
+
+class Recorder:
+    """Drives `game.update` and logs what is needed to replay it.
+
+    Recording starts with the first frame played after `start_game`; from
+    then on every frame is logged, including menu and end screens, because
+    the clock keeps running there and scheduled callbacks depend on it.
+    State changes made by input events between frames (clicking start,
+    pressing SPACE on an end screen) are logged as flags on the next frame;
+    a quick load is logged with the snapshot it loaded, so the replay does
+    not depend on the save slot or file.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.recording = Recording.for_game(game)
+        self.last_state = game.game_state
+        self.restored = None
+        game.on_restore = self._restored
+
+    def _restored(self, data):
+        self.restored = data
+
+    def update(self, frame_time):
+        game = self.game
+        mask = key_mask(game.backend.keyboard)
+        if game.game_state != self.last_state:
+            if game.game_state == GAME_STATE_PLAYING:
+                mask |= START_FLAG
+            elif game.game_state == GAME_STATE_MENU:
+                mask |= MENU_FLAG
+        restored = self.restored
+        self.restored = None
+        if restored is not None:
+            mask |= RESTORE_FLAG
+
+        game.update(frame_time)
+        self.last_state = game.game_state
+        if self.recording.frames or mask & START_FLAG:
+            self.recording.frames.append((mask, frame_time, state_hash(game)))
+            if restored is not None:
+                self.recording.restores.append(restored)
+
+    def save(self, path):
+        self.recording.save(path)
+
+
+class ReplayResult:
+    def __init__(self, frames, diverged_at, seconds):
+        self.frames = frames
+        self.diverged_at = diverged_at
+        self.seconds = seconds
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.seconds if self.seconds else float("inf")
+
+
+def replay(recording, game=None, check=True):
+    """Run a recording headless as fast as possible.
+
+    With `check`, stops at the first frame whose state hash differs from the
+    recorded one and reports it in `diverged_at`.
+    """
+    from .game import Game
+    from .headless import HeadlessBackend, step
+
+    if game is None:
+        game = Game(HeadlessBackend(), **recording.game_options())
+    keyboard = game.backend.keyboard
+
+    diverged_at = None
+    frames = 0
+    restores = iter(recording.restores)
+    start = time.perf_counter()
+    for mask, frame_time, digest in recording.frames:
+        if mask & MENU_FLAG:
+            game.on_key_down(game.backend.keys.SPACE)
+        if mask & START_FLAG:
+            game.start_game()
+        if mask & RESTORE_FLAG:
+            snapshot.restore(game, next(restores))
+        keyboard.set(key_names(mask))
+        step(game, frame_time)
+        frames += 1
+        if check and state_hash(game) != digest:
+            diverged_at = frames - 1
+            break
+    return ReplayResult(frames, diverged_at, time.perf_counter() - start)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m setorzero.replay RECORDING...")
+        return 2
+    status = 0
+    for path in argv:
+        result = replay(Recording.load(path))
+        if result.diverged_at is None:
+            print(f"{path}: {result.frames} frames in {result.seconds:.3f}s ({result.frames_per_second:.0f} fps), ok")
+        else:
+            print(f"{path}: diverged at frame {result.diverged_at}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+from pygame import Rect
+
+from .settings import (
+    WIDTH, HEIGHT, GOLD, GRAY,
+    GAME_STATE_MENU, GAME_STATE_PLAYING, GAME_STATE_LEVEL_COMPLETE, GAME_STATE_GAME_OVER, GAME_STATE_LOADING,
+)
+
+
+class Scene:
+    """One screen of the game: what it updates, draws and does with input.
+
+    `enter` and `exit` run when the game switches to and away from the
+    scene. A `static` scene only changes when something sets `needs_redraw`
+    (input, or the scene being entered), so once drawn it is skipped until
+    then, and the frame loop may sleep until the next event.
+    """
+
+    state = None
+    static = False
+
+    def __init__(self, game):
+        self.game = game
+        self.needs_redraw = True
+
+    def enter(self):
+        self.needs_redraw = True
+
+    def exit(self):
+        pass
+
+    def update(self, frame_time):
+        pass
+
+    def draw(self, screen):
+        pass
+
+    def on_key_down(self, key):
+        pass
+
+    def on_mouse_down(self, pos):
+        pass
+
+
+class LoadingScene(Scene):
+    state = GAME_STATE_LOADING
+
+    def update(self, frame_time):
+        if self.game.preloader.poll():
+            self.game._finish_loading()
+
+    def draw(self, screen):
+        game = self.game
+        game.loading_label.draw(screen, game.text_cache)
+        filled = game.loading_bar.copy()
+        filled.width = int(game.loading_bar.width * game.preloader.progress)
+        screen.draw.filled_rect(filled, GOLD)
+        screen.draw.rect(game.loading_bar, GRAY)
+
+
+class MenuScene(Scene):
+    state = GAME_STATE_MENU
+    static = True
+
+    def draw(self, screen):
+        game = self.game
+        game.title_label.draw(screen, game.text_cache)
+        game.subtitle_label.draw(screen, game.text_cache)
+        for button in game.menu_buttons:
+            button.draw()
+
+    def on_key_down(self, key):
+        if key == self.game.backend.keys.F9:
+            self.game.quick_load()
+
+    def on_mouse_down(self, pos):
+        for button in self.game.menu_buttons:
+            if button.on_mouse_down(pos):
+                break
+
+
+class PlayingScene(Scene):
+    state = GAME_STATE_PLAYING
+
+    def enter(self):
+        super().enter()
+        if self.game.gc_scheduler is not None:
+            self.game.gc_scheduler.pause()
+
+    def exit(self):
+        if self.game.gc_scheduler is not None:
+            self.game.gc_scheduler.resume()
+
+    def update(self, frame_time):
+        game = self.game
+        if game.gc_scheduler is not None:
+            game.gc_scheduler.tick()
+        timestep = game.timestep
+        if timestep is None:
+            game._simulate(frame_time)
+            return
+        steps = timestep.advance(frame_time)
+        for index in range(steps):
+            if index == steps - 1:
+                game._save_previous_positions()
+            game._simulate(timestep.step)
+            if game.scene is not self:
+                break
+
+    def draw(self, screen):
+        game = self.game
+        profiler = game.profiler
+        with profiler.scope("sprites"):
+            camera_x = game.camera.x
+            if game.camera.scrolls:
+                coins = game.coin_grid.query(Rect(camera_x, 0, WIDTH, HEIGHT))
+            else:
+                coins = game.coins
+            for coin in coins:
+                coin.draw(camera_x)
+            game.key.draw(camera_x)
+            game.door.draw(camera_x)
+            if game.enemy_batch is not None:
+                game.enemy_batch.sync()
+            for enemy in game.enemies:
+                enemy.draw(camera_x)
+
+            game.player.draw(camera_x)
+
+        with profiler.scope("hud"):
+            for label, value in game._hud_labels():
+                label.draw(screen, game.text_cache, value)
+
+    def on_key_down(self, key):
+        keys = self.game.backend.keys
+        if key == keys.F5:
+            self.game.quick_save()
+        elif key == keys.F9:
+            self.game.quick_load()
+
+
+class EndScene(Scene):
+    """A screen after the level is over: it waits for SPACE to go back to the menu."""
+
+    static = True
+
+    def on_key_down(self, key):
+        if key == self.game.backend.keys.SPACE:
+            self.game.return_to_menu()
+
+
+class LevelCompleteScene(EndScene):
+    state = GAME_STATE_LEVEL_COMPLETE
+
+    def draw(self, screen):
+        game = self.game
+        game.victory_label.draw(screen, game.text_cache)
+        game.final_score_label.draw(screen, game.text_cache, game.player.score)
+        game.remaining_lives_label.draw(screen, game.text_cache, game.total_lives)
+
+        game.continue_label.draw(screen, game.text_cache)
+
+
+class GameOverScene(EndScene):
+    state = GAME_STATE_GAME_OVER
+
+    def draw(self, screen):
+        game = self.game
+        game.game_over_label.draw(screen, game.text_cache)
+        game.game_over_score_label.draw(screen, game.text_cache, game.player.score)
+        game.retry_label.draw(screen, game.text_cache)
+
+
+SCENES = (LoadingScene, MenuScene, PlayingScene, LevelCompleteScene, GameOverScene)
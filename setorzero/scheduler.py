@@ -0,0 +1,96 @@
+from .entities import overlaps
+
+NEAR, MID, FAR = range(3)
+
+
+class AIScheduler:
+    """Level-of-detail scheduling for the scalar enemy update.
+
+    Enemies on screen, within `near_distance` of the player or close enough
+    to chase the player are updated every frame. The rest fall into the mid
+    or far tier by squared distance to the player; they bank the frame time
+    in `Enemy.tick_time` and are updated only once that reaches their tier's
+    interval, with everything they banked as one longer step. Near enemies
+    always run, and count against `budget` enemy updates per frame; reduced
+    ticks get what is left of it, but at least one, and enemies left over
+    stay due and go first on the next frame. Sorting enemies into tiers is
+    still a distance test on every loaded enemy, so only the updates are
+    bounded. Steps are capped at `max_step` so gravity and platform
+    collision stay stable for long-idle enemies; what a capped step leaves
+    stays banked for the next one.
+
+    Enemies pursuing the player along a navigation graph are always near.
+    Reduced-tier enemies are far from the player by construction, so only
+    the enemies that are updated are tested for contact with the player.
+    """
+
+    def __init__(self, near_distance=300, far_distance=900, mid_interval=1 / 30, far_interval=1 / 10,
+                 budget=32, max_step=0.1):
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.intervals = (0, mid_interval, far_interval)
+        self.budget = budget
+        self.max_step = max_step
+        self.cursor = 0
+        self.full_ticks = 0
+        self.reduced_ticks = 0
+        self.deferred = 0
+
+    def tier(self, enemy, player, view_left, view_right, navigation=None):
+        actor = enemy.actor
+        if actor.right >= view_left and actor.left <= view_right:
+            return NEAR
+        dx = player.x_position - enemy.x_position
+        dy = player.y_position - enemy.y_position
+        distance = dx * dx + dy * dy
+        if distance < enemy.detection_range * enemy.detection_range or distance < self.near_distance * self.near_distance:
+            return NEAR
+        if navigation is not None and navigation.pursues(enemy, dx):
+            return NEAR
+        return MID if distance < self.far_distance * self.far_distance else FAR
+
+    def update(self, enemies, frame_time, player, platform_grid, camera, navigation=None):
+        """Tick the enemies that are due this frame; returns True if one touched the player."""
+        view_left = camera.x
+        view_right = camera.x + camera.view_width
+        intervals = self.intervals
+        player_actor = player.actor
+        touched = False
+        near = 0
+
+        due = []
+        for enemy in enemies:
+            tier = self.tier(enemy, player, view_left, view_right, navigation)
+            if tier == NEAR:
+                step = frame_time
+                if enemy.tick_time:
+                    # Catch up on what was banked while it was further away.
+                    banked = enemy.tick_time + frame_time
+                    step = min(banked, max(self.max_step, frame_time))
+                    enemy.tick_time = banked - step
+                enemy.update(step, player, platform_grid.query(enemy.actor, enemy.fall_distance(step)), navigation)
+                near += 1
+                if overlaps(player_actor, enemy.actor):
+                    touched = True
+            else:
+                enemy.tick_time += frame_time
+                if enemy.tick_time >= intervals[tier]:
+                    due.append(enemy)
+
+        if due:
+            # Start where the last frame's budget ran out so no enemy starves.
+            count = len(due)
+            start = self.cursor % count
+            ticked = min(max(self.budget - near, 1), count)
+            for offset in range(ticked):
+                enemy = due[(start + offset) % count]
+                step = min(enemy.tick_time, self.max_step)
+                enemy.tick_time -= step
+                enemy.update(step, player, platform_grid.query(enemy.actor, enemy.fall_distance(step)), navigation)
+                if overlaps(player_actor, enemy.actor):
+                    touched = True
+            self.cursor = start + ticked
+            self.reduced_ticks += ticked
+            self.deferred += count - ticked
+        self.full_ticks += near
+        return touched
@@ -0,0 +1,34 @@
+import os
+
+WIDTH = 1200 
+HEIGHT = 800 
+TITLE = "SetorZero: The Game"
+SUBTITLE = "Desenvolvedor: Vinícius Lima"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRAY = (150, 150, 150)
+GOLD = (255, 215, 0)
+GREEN = (0, 200, 0)
+RED = (200, 0, 0)
+BLUE = (0, 0, 200)
+YELLOW = (255, 255, 0)
+
+GAME_STATE_MENU = 0
+GAME_STATE_PLAYING = 1
+GAME_STATE_LEVEL_COMPLETE = 2
+GAME_STATE_GAME_OVER = 3
+GAME_STATE_LOADING = 4
+
+ANIMATION_SPEED = 0.1 
+
+# Fixed simulation rate when physics is decoupled from rendering, and the
+# most steps one frame may run to catch up.
+PHYSICS_RATE = 60
+MAX_PHYSICS_STEPS = 5
+
+# Longest the frame loop sleeps waiting for input while a static screen
+# (menu, end screens) is showing.
+IDLE_TIMEOUT = 0.5
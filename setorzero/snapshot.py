@@ -0,0 +1,182 @@
+import struct
+
+from .world import save_enemy, restore_enemy
+
+MAGIC = b"SZSS"
+VERSION = 2
+
+# magic, version, level number (0: a level built from data, not a file), chunk count
+_HEADER = struct.Struct("<4sHHH")
+# game state, lives, door message shown, simulated time, end of invulnerability, physics time banked,
+# surface pursuing enemies head for (-1: none)
+_GAME = struct.Struct("<Bi?dddi")
+# x, y, velocity_y, on_ground, is_jumping, is_moving, facing_right, have_key, invulnerable,
+# score, current_frame, frame, animation_timer, key collected, door open
+_PLAYER = struct.Struct("<3d6?iHHd??")
+# coins, enemies in a chunk
+_CHUNK = struct.Struct("<HH")
+_COIN = struct.Struct("<2d")
+# save_enemy(): x, y, patrol min/max, velocity_y, moving_to_max, facing_right, speed, chase speed,
+# detection range, on_ground, current_frame, frame, animation_timer, tick_time
+_ENEMY = struct.Struct("<5d??3d?HHdd")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def capture(game):
+    """Everything a level in progress needs to resume, packed into bytes.
+
+    Platforms come from the level file and are not stored. Coins and enemies
+    are stored per chunk, loaded or not, so a snapshot of a streamed level
+    is as complete as one of a single screen.
+    """
+    if game.player is None or game.world is None:
+        raise SnapshotError("no level in progress")
+    if game.enemy_batch is not None:
+        game.enemy_batch.sync()
+
+    world = game.world
+    pool = world.pools["enemy"]
+    coins = [list(chunk.coins) for chunk in world.chunks]
+    enemies = [[record if len(record) > 4 else _expand(pool, record) for record in chunk.enemies]
+               for chunk in world.chunks]
+    for chunk in world.chunks:
+        if chunk.loaded:
+            coins[chunk.index].extend((coin.x_position, coin.y_position)
+                                      for coin in chunk.live_coins if coin.slot != -1)
+            # Enemies are filed under the chunk they are in now, as unloading would.
+            for enemy in chunk.live_enemies:
+                enemies[world.chunk_index(enemy.x_position)].append(save_enemy(enemy))
+
+    player = game.player
+    banked = game.timestep.accumulator if game.timestep is not None else 0.0
+    # Pursuit steers by the surface the player last stood on, which may be
+    # a jump ago.
+    navigation = game.navigation
+    target = navigation.target.index if navigation is not None and navigation.target is not None else -1
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, game.level_number or 0, len(world.chunks)),
+        _GAME.pack(game.game_state, game.total_lives, game.show_door_message, game.sim_time,
+                   game.invulnerable_until, banked, target),
+        _PLAYER.pack(player.x_position, player.y_position, player.velocity_y,
+                     player.on_ground, player.is_jumping, player.is_moving, player.facing_right,
+                     player.have_key, player.invulnerable, player.score,
+                     player.current_frame, player.frame, player.animation_timer,
+                     game.key.collected, game.door.is_open),
+    ]
+    for chunk_coins, chunk_enemies in zip(coins, enemies):
+        parts.append(_CHUNK.pack(len(chunk_coins), len(chunk_enemies)))
+        parts.extend(_COIN.pack(*coin) for coin in chunk_coins)
+        parts.extend(_ENEMY.pack(*enemy) for enemy in chunk_enemies)
+    return b"".join(parts)
+
+
+def _expand(pool, record):
+    """The full state of an enemy that is still only a level record."""
+    enemy = restore_enemy(pool, record)
+    state = save_enemy(enemy)
+    pool.release(enemy)
+    return state
+
+
+def restore(game, data):
+    """Put `game` back in the state `capture` saw, reusing pooled entities."""
+    try:
+        state = _unpack(data)
+    except struct.error:
+        raise SnapshotError("truncated or corrupt snapshot") from None
+    level_number, game_fields, player_fields, chunks = state
+
+    if level_number:
+        level = game._level_data(level_number)
+    elif game.world is not None:
+        level = game.world.level
+    else:
+        raise SnapshotError("snapshot of an unnumbered level needs that level loaded")
+    if game.world is None or game.world.level is not level or game.player is None:
+        game._setup_level(level)
+    world = game.world
+    if len(world.chunks) != len(chunks):
+        raise SnapshotError("snapshot does not match the level's layout")
+
+    world.reset()
+    for chunk, (coins, enemies) in zip(world.chunks, chunks):
+        chunk.coins[:] = coins
+        chunk.enemies[:] = enemies
+
+    game_state, total_lives, show_door_message, sim_time, invulnerable_until, banked, target = game_fields
+    (x, y, velocity_y, on_ground, is_jumping, is_moving, facing_right, have_key, invulnerable, score,
+     current_frame, frame, animation_timer, key_collected, door_open) = player_fields
+    player = game.player
+    player.x_position, player.y_position, player.velocity_y = x, y, velocity_y
+    player.on_ground, player.is_jumping, player.is_moving = on_ground, is_jumping, is_moving
+    player.facing_right = facing_right
+    player.have_key, player.invulnerable, player.score = have_key, invulnerable, score
+    player.current_frame, player.frame, player.animation_timer = current_frame, frame, animation_timer
+    player.image = player.frames.names[frame]
+    player.actor.image = player.image
+    player.actor.pos = (x, y)
+
+    if not invulnerable:
+        player.actor.image_alpha = 255
+
+    game.key.reset(*level.key)
+    game.key.collected = key_collected
+    game.door.reset(*level.door)
+    if door_open:
+        game.door.is_open = True
+        game.door.actor.place("door_open", (game.door.x_position, game.door.y_position))
+
+    game.game_state = game_state
+    game.total_lives = total_lives
+    game.show_door_message = show_door_message
+    game.sim_time = sim_time
+    game.invulnerable_until = invulnerable_until
+    if game.timestep is not None:
+        game.timestep.accumulator = banked
+    navigation = game.navigation
+    if navigation is not None:
+        navigation.target = navigation.surfaces[target] if 0 <= target < len(navigation.surfaces) else None
+    game.enemy_batch = None
+    game.previous_positions = None
+    game._stream_world()
+    if game.dirty_renderer is not None:
+        game.dirty_renderer.invalidate()
+
+
+def _unpack(data):
+    magic, version, level_number, chunk_count = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a SetorZero snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"unsupported snapshot version: {version}")
+    offset = _HEADER.size
+    game_fields = _GAME.unpack_from(data, offset)
+    offset += _GAME.size
+    player_fields = _PLAYER.unpack_from(data, offset)
+    offset += _PLAYER.size
+
+    chunks = []
+    for _ in range(chunk_count):
+        coin_count, enemy_count = _CHUNK.unpack_from(data, offset)
+        offset += _CHUNK.size
+        coins = [_COIN.unpack_from(data, offset + index * _COIN.size) for index in range(coin_count)]
+        offset += coin_count * _COIN.size
+        enemies = [_ENEMY.unpack_from(data, offset + index * _ENEMY.size) for index in range(enemy_count)]
+        offset += enemy_count * _ENEMY.size
+        chunks.append((coins, enemies))
+    if offset != len(data):
+        raise SnapshotError("truncated or corrupt snapshot")
+    return level_number, game_fields, player_fields, chunks
+
+
+def save(game, path):
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(capture(game))
+
+
+def load(game, path):
+    with open(path, "rb") as snapshot_file:
+        restore(game, snapshot_file.read())
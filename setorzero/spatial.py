@@ -0,0 +1,104 @@
+# Cells are keyed by `column * STRIDE + row`, which stays unique while rows
+# are within STRIDE / 2 of zero, far past any level's height.
+STRIDE = 1 << 20
+
+
+class SpatialGrid:
+    """Uniform grid over rects, for finding the few objects near an actor.
+
+    Every item is stored in each cell its rect overlaps. `query` returns the
+    candidates in insertion order, so callers that resolve several
+    collisions in sequence behave exactly as if they looped over the full
+    list. It fills the same list every time, so a result is only good
+    until the next query on the grid.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}
+        self.next_index = 0
+        self.found = {}
+        self.indexes = []
+        self.result = []
+
+    def _cell_keys(self, rect, extend_down=0):
+        x, y, w, h = rect
+        h += extend_down
+        size = self.cell_size
+        first = int(y // size)
+        last = int((y + h) // size)
+        keys = []
+        row = int(x // size) * STRIDE
+        end = int((x + w) // size) * STRIDE
+        while row <= end:
+            key = row + first
+            stop = row + last
+            while key <= stop:
+                keys.append(key)
+                key += 1
+            row += STRIDE
+        return keys
+
+    def insert(self, item, rect):
+        keys = self._cell_keys(rect)
+        entry = (self.next_index, item)
+        self.next_index += 1
+        for key in keys:
+            self.cells.setdefault(key, []).append(entry)
+        self.entries[id(item)] = (entry, keys)
+
+    def remove(self, item):
+        entry, keys = self.entries.pop(id(item))
+        for key in keys:
+            cell = self.cells[key]
+            cell.remove(entry)
+            if not cell:
+                del self.cells[key]
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.next_index = 0
+
+    def query(self, rect, extend_down=0):
+        """Items near `rect`, which may be stretched down to cover a fall."""
+        cells = self.cells
+        size = self.cell_size
+        found = self.found
+        found.clear()
+        left = rect.left
+        top = rect.top
+        bottom = top + rect.height + extend_down
+        first = int(top // size)
+        last = int(bottom // size)
+        row = int(left // size) * STRIDE
+        end = int((left + rect.width) // size) * STRIDE
+        while row <= end:
+            key = row + first
+            stop = row + last
+            while key <= stop:
+                cell = cells.get(key)
+                if cell:
+                    found.update(cell)
+                key += 1
+            row += STRIDE
+        result = self.result
+        result.clear()
+        if len(found) < 2:
+            result.extend(found.values())
+            return result
+        indexes = self.indexes
+        indexes.clear()
+        indexes.extend(found)
+        indexes.sort()
+        for index in indexes:
+            result.append(found[index])
+        return result
+
+    @classmethod
+    def from_actors(cls, objects, cell_size=128):
+        grid = cls(cell_size)
+        for obj in objects:
+            grid.insert(obj, obj.actor)
+        return grid
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+_UNSET = object()
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, fontsize, color), LRU-bounded."""
+
+    def __init__(self, render, max_size=64):
+        self.render = render
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def get(self, text, fontsize, color):
+        key = (text, fontsize, color)
+        surface = self.surfaces.get(key, _UNSET)
+        if surface is _UNSET:
+            surface = self.render(text, fontsize, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class TextLabel:
+    """A piece of text at a fixed spot that only re-renders when its value changes.
+
+    `template` is formatted with the value passed to `draw`; labels without
+    a placeholder are rendered once and then just blitted.
+    """
+
+    def __init__(self, template, fontsize, color, center=None, topleft=None):
+        self.template = template
+        self.fontsize = fontsize
+        self.color = color
+        if center is not None:
+            self.anchor_pos, self.anchor = center, (0.5, 0.5)
+        else:
+            self.anchor_pos, self.anchor = topleft, (0, 0)
+        self.value = _UNSET
+        self.surface = None
+        self.pos = None
+
+    def update(self, cache, value=None):
+        if value == self.value:
+            return False
+        self.value = value
+        self.surface = cache.get(self.template.format(value), self.fontsize, self.color)
+        if self.surface is not None:
+            x, y = self.anchor_pos
+            hanchor, vanchor = self.anchor
+            self.pos = (int(round(x - hanchor * self.surface.get_width())),
+                        int(round(y - vanchor * self.surface.get_height())))
+        return True
+
+    def draw(self, screen, cache, value=None):
+        self.update(cache, value)
+        if self.surface is not None:
+            screen.blit(self.surface, self.pos)
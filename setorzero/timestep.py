@@ -0,0 +1,37 @@
+from .settings import PHYSICS_RATE, MAX_PHYSICS_STEPS
+
+
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed simulation steps.
+
+    Frame time is banked in `accumulator` and spent `step` seconds at a time,
+    so the simulation advances the same way whatever the render rate. At
+    most `max_steps` run per frame; time beyond that is dropped (and counted
+    in `dropped`) so one slow frame cannot snowball into ever longer ones.
+    `alpha` is how far the leftover time reaches into the next step, for
+    interpolating what is drawn.
+    """
+
+    def __init__(self, rate=PHYSICS_RATE, max_steps=MAX_PHYSICS_STEPS):
+        self.rate = rate
+        self.step = 1 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped = 0
+
+    def advance(self, frame_time):
+        """Bank `frame_time` and return how many steps to simulate now."""
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.step)
+        self.accumulator -= steps * self.step
+        if steps > self.max_steps:
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step, 1.0)
@@ -0,0 +1,208 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .pool import Pool
+from .settings import GAME_STATE_PLAYING, GAME_STATE_LEVEL_COMPLETE
+
+PLAYER_PARAMETERS = ("jump_strength", "gravity")
+ENEMY_PARAMETERS = ("speed", "chase_speed", "detection_range")
+
+RANDOM_MOVES = (
+    ("right",), ("left",), ("right", "space"), ("left", "space"), ("space",), (),
+)
+
+
+def random_policy(game, frame, rng):
+    """Mashes a random move every quarter second, always ready to open the door."""
+    if frame % 15 == 0:
+        game.backend.keyboard.set(rng.choice(RANDOM_MOVES) + ("f",))
+
+
+def climber_policy(game, frame, rng):
+    """Runs back and forth across the screen, jumping whenever it lands."""
+    keyboard = game.backend.keyboard
+    player = game.player
+    if frame % 240 == 0:
+        keyboard.set(("right" if (frame // 240) % 2 == 0 else "left", "f"))
+    if player.on_ground and rng.random() < 0.2:
+        keyboard.press("space")
+    else:
+        keyboard.release("space")
+
+
+POLICIES = {
+    "random": random_policy,
+    "climber": climber_policy,
+}
+
+
+class TunedPool(Pool):
+    """Pool that sets `parameters` on every entity it hands out, after its reset to the defaults."""
+
+    def __init__(self, factory, parameters):
+        super().__init__(factory)
+        self.parameters = parameters
+
+    def acquire(self, *args):
+        item = super().acquire(*args)
+        for name, value in self.parameters.items():
+            setattr(item, name, value)
+        return item
+
+
+class Episode:
+    """One headless run: the parameters to apply, the input policy and its seed."""
+
+    def __init__(self, parameters=None, policy="random", seed=0, frames=60 * 60, frame_time=1 / 60,
+                 batch_enemies=False):
+        self.parameters = dict(parameters or {})
+        self.policy = policy
+        self.seed = seed
+        self.frames = frames
+        self.frame_time = frame_time
+        self.batch_enemies = batch_enemies
+
+
+def run_episode(episode):
+    from .game import Game
+    from .headless import HeadlessBackend, step
+
+    rng = random.Random(episode.seed)
+    policy = POLICIES[episode.policy]
+    for name in episode.parameters:
+        if name not in PLAYER_PARAMETERS and name not in ENEMY_PARAMETERS:
+            raise ValueError(f"unknown parameter: {name}")
+    game = Game(HeadlessBackend(), batch_enemies=episode.batch_enemies)
+    # Enemies are streamed in and out of the pool as the camera moves;
+    # each one handed out, new or reused, gets the episode's values.
+    game.pools["enemy"] = TunedPool(game.pools["enemy"].factory, {
+        name: value for name, value in episode.parameters.items() if name in ENEMY_PARAMETERS})
+    game.start_game()
+    for name, value in episode.parameters.items():
+        if name in PLAYER_PARAMETERS:
+            setattr(game.player, name, value)
+
+    elapsed = 0.0
+    time_to_key = None
+    frames = 0
+    start = time.perf_counter()
+    while frames < episode.frames and game.game_state == GAME_STATE_PLAYING:
+        policy(game, frames, rng)
+        step(game, episode.frame_time)
+        frames += 1
+        elapsed += episode.frame_time
+        if time_to_key is None and game.player.have_key:
+            time_to_key = elapsed
+    seconds = time.perf_counter() - start
+
+    completed = game.game_state == GAME_STATE_LEVEL_COMPLETE
+    return {
+        "parameters": episode.parameters,
+        "policy": episode.policy,
+        "seed": episode.seed,
+        "coins": game.player.score // 10,
+        "lives_lost": 3 - game.total_lives,
+        "time_to_key": time_to_key,
+        "time_to_door": elapsed if completed else None,
+        "completed": completed,
+        "frames": frames,
+        "frames_per_second": frames / seconds if seconds else None,
+    }
+
+
+def sweep(grid, seeds=10, **episode_options):
+    """Every combination of the `grid` values, each run with `seeds` seeds."""
+    names = sorted(grid)
+    episodes = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        for seed in range(seeds):
+            episodes.append(Episode(dict(zip(names, values)), seed=seed, **episode_options))
+    return episodes
+
+
+def run_episodes(episodes, processes=None):
+    """Run episodes across a process pool; returns (results, wall-clock seconds)."""
+    processes = processes or os.cpu_count() or 1
+    start = time.perf_counter()
+    if processes == 1:
+        results = [run_episode(episode) for episode in episodes]
+    else:
+        chunksize = max(1, len(episodes) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(run_episode, episodes, chunksize=chunksize))
+    return results, time.perf_counter() - start
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def aggregate(results, wall_seconds=None):
+    groups = {}
+    for result in results:
+        key = json.dumps(result["parameters"], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+
+    report = {"episodes": len(results), "frames": sum(result["frames"] for result in results), "groups": []}
+    if wall_seconds:
+        report["wall_seconds"] = wall_seconds
+        report["frames_per_second"] = report["frames"] / wall_seconds
+    for key, group in groups.items():
+        report["groups"].append({
+            "parameters": json.loads(key),
+            "episodes": len(group),
+            "coins": _mean(result["coins"] for result in group),
+            "lives_lost": _mean(result["lives_lost"] for result in group),
+            "key_rate": sum(result["time_to_key"] is not None for result in group) / len(group),
+            "time_to_key": _mean(result["time_to_key"] for result in group),
+            "completion_rate": sum(result["completed"] for result in group) / len(group),
+            "time_to_door": _mean(result["time_to_door"] for result in group),
+            "frames_per_second": _mean(result["frames_per_second"] for result in group),
+        })
+    return report
+
+
+def _values(text):
+    return [float(value) for value in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m setorzero.tuning",
+                                     description="Run headless episodes over a grid of gameplay parameters.")
+    for name in ENEMY_PARAMETERS + PLAYER_PARAMETERS:
+        parser.add_argument("--" + name.replace("_", "-"), type=_values, metavar="V1,V2,...")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--seconds", type=float, default=60.0, help="game time per episode")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--batch-enemies", action="store_true")
+    parser.add_argument("--json", metavar="PATH", help="write the aggregated report here")
+    args = parser.parse_args(argv)
+
+    grid = {name: getattr(args, name) for name in ENEMY_PARAMETERS + PLAYER_PARAMETERS
+            if getattr(args, name) is not None}
+    episodes = sweep(grid, seeds=args.seeds, policy=args.policy, frames=int(args.seconds * 60),
+                     batch_enemies=args.batch_enemies)
+    results, wall_seconds = run_episodes(episodes, args.processes)
+    report = aggregate(results, wall_seconds)
+
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    print(f"{report['episodes']} episodes, {report['frames']} frames in {wall_seconds:.2f}s "
+          f"({report['frames_per_second']:.0f} frames/s)")
+    for group in report["groups"]:
+        print(f"  {group['parameters']}: coins {group['coins']:.2f}, lives lost {group['lives_lost']:.2f}, "
+              f"key {group['key_rate']:.0%}, completed {group['completion_rate']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
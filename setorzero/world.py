@@ -0,0 +1,248 @@
+import math
+
+from . import backends
+from .entities import Platform, Coin, Enemy
+from .pool import Pool
+from .spatial import SpatialGrid
+from .settings import WIDTH
+
+
+class Chunk:
+    """A vertical slice of the world and the records of what lives in it.
+
+    While unloaded only `coins` (x, y of the coins still to collect) and
+    `enemies` (saved enemy states) are kept; loading turns them into the
+    entities in `live_coins` and `live_enemies`. `initial_coins` and
+    `initial_enemies` are the level's records, used to restart.
+    """
+
+    __slots__ = ("index", "left", "right", "platforms", "coins", "enemies", "initial_coins", "initial_enemies",
+                 "live_coins", "live_enemies", "loaded", "layer_key")
+
+    def __init__(self, index, left, right):
+        self.index = index
+        self.left = left
+        self.right = right
+        self.platforms = []
+        self.coins = []
+        self.enemies = []
+        self.initial_coins = ()
+        self.initial_enemies = ()
+        self.live_coins = []
+        self.live_enemies = []
+        self.loaded = False
+        self.layer_key = ()
+
+
+def make_pools():
+    return {"platform": Pool(Platform), "coin": Pool(Coin), "enemy": Pool(Enemy)}
+
+
+class ChunkedWorld:
+    """A level split into fixed-width chunks that are loaded around the camera.
+
+    Chunks overlapping the view, plus half a chunk either side, are active:
+    their enemies are simulated. One more chunk either side is loaded but
+    frozen, so active enemies always have ground to walk onto, and chunks
+    further than two away are unloaded. Unloading drops the entities and
+    keeps only compact records, so memory and per-frame work follow what is
+    near the player rather than the length of the level.
+
+    `platforms`, `coins`, `enemies` and `active_enemies` are updated in
+    place, so references to them stay valid while the world streams.
+    Entities come from `pools` and go back to them when their chunk is
+    unloaded or the world is reset, so streaming and restarts reuse objects
+    instead of allocating new ones.
+    """
+
+    def __init__(self, level, chunk_width=WIDTH, pools=None):
+        self.level = level
+        self.chunk_width = chunk_width
+        self.pools = pools if pools is not None else make_pools()
+        count = max(1, math.ceil(level.width / chunk_width))
+        self.chunks = [Chunk(index, index * chunk_width, (index + 1) * chunk_width) for index in range(count)]
+        self.platforms = []
+        self.coins = []
+        self.enemies = []
+        self.active_enemies = []
+        self.platform_grid = SpatialGrid()
+        self.coin_grid = SpatialGrid()
+        # platform record index -> [Platform, number of loaded chunks holding it]
+        self.live_platforms = {}
+        self.window = None
+
+        # Platforms are listed in every chunk they overlap, so one that spans
+        # a boundary is loaded as long as either side is.
+        widths = {}
+        platforms = level.platforms
+        for index, image_index in enumerate(level.platform_images):
+            image = level.images[image_index]
+            if image not in widths:
+                widths[image] = backends.active.image_size(image)[0]
+            x = platforms[2 * index]
+            half_width = widths[image] / 2
+            for chunk in self.chunks[self.chunk_index(x - half_width):self.chunk_index(x + half_width) + 1]:
+                chunk.platforms.append(index)
+                chunk.layer_key += ((image, x, platforms[2 * index + 1]),)
+
+        coins = level.coins
+        for index in range(0, len(coins), 2):
+            self.chunks[self.chunk_index(coins[index])].coins.append((coins[index], coins[index + 1]))
+
+        enemies = level.enemies
+        for index in range(0, len(enemies), 4):
+            self.chunks[self.chunk_index(enemies[index])].enemies.append(tuple(enemies[index:index + 4]))
+
+        for chunk in self.chunks:
+            chunk.initial_coins = tuple(chunk.coins)
+            chunk.initial_enemies = tuple(chunk.enemies)
+
+    def reset(self):
+        """Return every entity to its pool and put the level back as it started."""
+        pools = self.pools
+        pools["platform"].release_all(entry[0] for entry in self.live_platforms.values())
+        self.live_platforms.clear()
+        for chunk in self.chunks:
+            pools["coin"].release_all(chunk.live_coins)
+            chunk.live_coins.clear()
+            chunk.live_enemies.clear()
+            chunk.coins[:] = chunk.initial_coins
+            chunk.enemies[:] = chunk.initial_enemies
+            chunk.loaded = False
+        pools["enemy"].release_all(self.enemies)
+        for items in (self.platforms, self.coins, self.enemies, self.active_enemies):
+            items.clear()
+        self.platform_grid.clear()
+        self.coin_grid.clear()
+        self.window = None
+
+    def remove_coin(self, coin):
+        """Take a collected coin out of play in O(1), swapping the last coin into its slot."""
+        self.coin_grid.remove(coin)
+        coins = self.coins
+        last = coins.pop()
+        if last is not coin:
+            coins[coin.slot] = last
+            last.slot = coin.slot
+        coin.slot = -1
+
+    def chunk_index(self, x):
+        return min(max(int(x // self.chunk_width), 0), len(self.chunks) - 1)
+
+    def window_at(self, view_left, view_width=WIDTH):
+        """First and last active chunk for a view starting at `view_left`."""
+        margin = self.chunk_width / 2
+        return self.chunk_index(view_left - margin), self.chunk_index(view_left + view_width + margin)
+
+    def chunks_in_view(self, view_left, view_width=WIDTH):
+        return self.chunks[self.chunk_index(view_left):self.chunk_index(view_left + view_width - 1) + 1]
+
+    def stream(self, view_left, view_width=WIDTH):
+        """Load and unload chunks around the view; returns True if anything changed."""
+        first, last = window = self.window_at(view_left, view_width)
+        if window == self.window:
+            return False
+        self.window = window
+
+        for chunk in self.chunks:
+            if chunk.loaded and not first - 2 <= chunk.index <= last + 2:
+                self._unload(chunk)
+        for chunk in self.chunks[max(first - 1, 0):last + 2]:
+            if not chunk.loaded:
+                self._load(chunk)
+
+        active_left = self.chunks[first].left if first > 0 else -math.inf
+        active_right = self.chunks[last].right if last < len(self.chunks) - 1 else math.inf
+        self.active_enemies[:] = [enemy for enemy in self.enemies
+                                  if active_left <= enemy.x_position < active_right]
+        return True
+
+    def _load(self, chunk):
+        level = self.level
+        pools = self.pools
+        for index in chunk.platforms:
+            entry = self.live_platforms.get(index)
+            if entry is None:
+                platform = pools["platform"].acquire(level.platforms[2 * index], level.platforms[2 * index + 1],
+                                                     level.images[level.platform_images[index]])
+                self.live_platforms[index] = [platform, 1]
+                self.platforms.append(platform)
+                self.platform_grid.insert(platform, platform.actor)
+            else:
+                entry[1] += 1
+
+        for x, y in chunk.coins:
+            coin = pools["coin"].acquire(x, y)
+            coin.slot = len(self.coins)
+            chunk.live_coins.append(coin)
+            self.coins.append(coin)
+            self.coin_grid.insert(coin, coin.actor)
+        chunk.coins.clear()
+
+        for state in chunk.enemies:
+            enemy = restore_enemy(pools["enemy"], state)
+            chunk.live_enemies.append(enemy)
+            self.enemies.append(enemy)
+        chunk.enemies.clear()
+        chunk.loaded = True
+
+    def _unload(self, chunk):
+        chunk.loaded = False
+        pools = self.pools
+        dropped = set()
+        for index in chunk.platforms:
+            entry = self.live_platforms[index]
+            entry[1] -= 1
+            if not entry[1]:
+                del self.live_platforms[index]
+                self.platform_grid.remove(entry[0])
+                pools["platform"].release(entry[0])
+                dropped.add(id(entry[0]))
+
+        # Coins collected while the chunk was loaded are already out of play.
+        for coin in chunk.live_coins:
+            if coin.slot != -1:
+                chunk.coins.append((coin.x_position, coin.y_position))
+                self.coin_grid.remove(coin)
+                dropped.add(id(coin))
+        pools["coin"].release_all(chunk.live_coins)
+        chunk.live_coins.clear()
+
+        # Enemies are filed under the chunk they have wandered into, which
+        # may still be loaded.
+        for enemy in chunk.live_enemies:
+            target = self.chunks[self.chunk_index(enemy.x_position)]
+            if target.loaded:
+                target.live_enemies.append(enemy)
+            else:
+                target.enemies.append(save_enemy(enemy))
+                pools["enemy"].release(enemy)
+                dropped.add(id(enemy))
+        chunk.live_enemies.clear()
+
+        if dropped:
+            for items in (self.platforms, self.coins, self.enemies):
+                items[:] = [item for item in items if id(item) not in dropped]
+            for slot, coin in enumerate(self.coins):
+                coin.slot = slot
+
+
+def save_enemy(enemy):
+    return (enemy.x_position, enemy.y_position, enemy.patrol_range_x_min, enemy.patrol_range_x_max,
+            enemy.velocity_y, enemy.moving_to_max, enemy.facing_right,
+            enemy.speed, enemy.chase_speed, enemy.detection_range,
+            enemy.on_ground, enemy.current_frame, enemy.frame, enemy.animation_timer, enemy.tick_time)
+
+
+def restore_enemy(pool, state):
+    """Take an enemy from `pool` set up from a level record (x, y, patrol range) or a `save_enemy` state."""
+    enemy = pool.acquire(*state[:4])
+    if len(state) > 4:
+        (enemy.velocity_y, enemy.moving_to_max, enemy.facing_right,
+         enemy.speed, enemy.chase_speed, enemy.detection_range,
+         enemy.on_ground, enemy.current_frame, enemy.frame, enemy.animation_timer, enemy.tick_time) = state[4:]
+        enemy.is_jumping = not enemy.on_ground
+        enemy.image = enemy.frames.names[enemy.frame]
+        enemy.actor.image = enemy.image
+        enemy.actor.pos = (enemy.x_position, enemy.y_position)
+    return enemy
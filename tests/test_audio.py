@@ -0,0 +1,32 @@
+import types
+
+import pygame
+import pytest
+
+from setorzero.audio import CATEGORIES, FREQUENCY, AudioMixer, init_mixer
+
+
+@pytest.fixture
+def mixer():
+    init_mixer()
+    if pygame.mixer.get_init() is None:
+        pytest.skip("no audio device")
+    yield
+    pygame.mixer.quit()
+
+
+def test_only_the_pools_are_reserved(mixer):
+    free = pygame.mixer.get_num_channels()
+    sound = pygame.mixer.Sound(buffer=bytes(4 * FREQUENCY))
+    audio = AudioMixer(types.SimpleNamespace(coin_sound=sound))
+    assert pygame.mixer.get_init()[0] == FREQUENCY == audio.frequency
+    assert pygame.mixer.get_num_channels() == free + sum(CATEGORIES.values())
+
+    # Sounds played the way pgzero plays them still get every channel the mixer had.
+    played = 0
+    while played <= free and sound.play() is not None:
+        played += 1
+    assert played == free
+    audio.play("coin_sound")
+    audio.flush()
+    assert audio.stolen == 0 and any(channel.get_busy() for channel in audio.channels["pickup"])
@@ -0,0 +1,34 @@
+import pytest
+
+from setorzero.benchmark import scripted_input
+from setorzero.game import Game
+from setorzero.generator import level_loader
+from setorzero.headless import HeadlessBackend, step
+from setorzero.replay import state_hash
+from setorzero.settings import GAME_STATE_PLAYING
+
+pytest.importorskip("numpy")
+
+
+def hashes(frames, frame_time, **options):
+    game = Game(HeadlessBackend(), **options)
+    game.start_game()
+    digests = []
+    for frame in range(frames):
+        scripted_input(game.backend.keyboard, frame)
+        step(game, frame_time)
+        digests.append(state_hash(game))
+        if game.game_state != GAME_STATE_PLAYING:
+            break
+    return digests
+
+
+@pytest.mark.parametrize("frames, frame_time, options", [
+    (900, 1 / 60, {}),
+    (900, 1 / 60, {"level_loader": level_loader(5, 4000)}),
+    (300, 1 / 20, {"physics_rate": 0}),
+], ids=["level_1", "streamed", "long_frames"])
+def test_batch_matches_the_scalar_path_every_frame(frames, frame_time, options):
+    scalar = hashes(frames, frame_time, **options)
+    assert len(scalar) > 100
+    assert hashes(frames, frame_time, batch_enemies=True, **options) == scalar
@@ -0,0 +1,36 @@
+from setorzero.benchmark import compare
+
+BASELINE = {
+    "widex1": {"layout": "wide", "scale": 1, "update_us": 100.0, "draw_us": 200.0},
+    "widex10": {"layout": "wide", "scale": 10, "update_us": 1000.0, "draw_us": 0.0},
+}
+
+
+def cases(**metrics):
+    return {name: dict(BASELINE[name], **metrics.get(name, {})) for name in BASELINE}
+
+
+def test_no_regressions_within_the_threshold():
+    results = cases(widex1={"update_us": 124.0, "draw_us": 150.0})
+    assert compare(results, BASELINE, {"default": 0.25}) == []
+
+
+def test_regressions_past_the_threshold_are_reported():
+    results = cases(widex1={"update_us": 130.0}, widex10={"update_us": 1300.0})
+    regressions = compare(results, BASELINE, {"default": 0.25})
+    assert [(item["case"], item["metric"]) for item in regressions] == [("widex1", "update_us"),
+                                                                        ("widex10", "update_us")]
+    assert abs(regressions[0]["change"] - 0.3) < 1e-9
+    assert regressions[0]["threshold"] == 0.25
+
+
+def test_per_metric_thresholds():
+    results = cases(widex1={"update_us": 130.0, "draw_us": 290.0})
+    regressions = compare(results, BASELINE, {"default": 0.5, "update_us": 0.1})
+    assert [(item["case"], item["metric"]) for item in regressions] == [("widex1", "update_us")]
+
+
+def test_cases_and_metrics_without_a_baseline_are_skipped():
+    results = cases(widex10={"draw_us": 500.0})
+    results["densex1"] = {"layout": "dense", "scale": 1, "update_us": 1e6, "draw_us": 1e6}
+    assert compare(results, BASELINE, {}) == []
@@ -0,0 +1,32 @@
+import zlib
+
+import pygame
+import pytest
+
+from setorzero.benchmark import offscreen_backend, scripted_input
+from setorzero.game import Game
+from setorzero.generator import level_loader
+from setorzero.settings import GAME_STATE_PLAYING
+
+
+def frames(dirty_rendering, count, **options):
+    backend = offscreen_backend()
+    game = Game(backend, dirty_rendering=dirty_rendering, **options)
+    game.start_game()
+    digests = []
+    for frame in range(count):
+        scripted_input(backend.keyboard, frame)
+        backend.clock.tick(1 / 60)
+        game.update(1 / 60)
+        game.draw()
+        if game.game_state != GAME_STATE_PLAYING:
+            break
+        digests.append(zlib.crc32(backend.screen.surface.get_view("2")))
+    return digests
+
+
+@pytest.mark.parametrize("options", [{}, {"level_loader": level_loader(7, 2400)}], ids=["level_1", "scrolling"])
+def test_dirty_rects_draw_what_a_full_redraw_draws(options):
+    full = frames(False, 400, **options)
+    assert len(full) > 100
+    assert frames(True, 400, **options) == full
@@ -0,0 +1,53 @@
+from array import array
+
+import pytest
+
+from setorzero import backends
+from setorzero.entities import Player
+from setorzero.generator import KEY_LIFT, LEDGE, _reachable, generate
+from setorzero.headless import HeadlessBackend
+from setorzero.settings import WIDTH
+
+
+@pytest.fixture(autouse=True)
+def backend():
+    # The generator reads sprite sizes off the active backend.
+    backends.use(HeadlessBackend())
+
+
+def key_and_door_surfaces(level, player):
+    """Where the key and door stand, in the form `_reachable` takes them."""
+    key_height = backends.active.image_size("key")[1]
+    door_height = backends.active.image_size("door_closed")[1]
+    return ((level.key[0], level.key[1] + key_height / 2 + 10),
+            (level.door[0], level.door[1] + door_height / 2))
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_generated_levels_are_reachable(seed):
+    level = generate(seed, WIDTH * 3)
+    player = Player(*level.player)
+    assert _reachable(level, player, *key_and_door_surfaces(level, player))
+    assert 0 < level.key[0] < level.width and 0 < level.door[0] < level.width
+    enemies = level.enemies
+    for index in range(0, len(enemies), 4):
+        x, _, patrol_min, patrol_max = enemies[index:index + 4]
+        assert patrol_min <= x <= patrol_max
+
+
+def test_key_out_of_reach_is_rejected():
+    level = generate(3, WIDTH * 2)
+    player = Player(*level.player)
+    key_surface, door_surface = key_and_door_surfaces(level, player)
+    # A ledge far above everything else, with the key on it.
+    ledge_top = -2000 - backends.active.image_size(LEDGE)[1] / 2
+    level.platforms = array("d", level.platforms) + array("d", (level.key[0], -2000.0))
+    level.platform_images = array("H", level.platform_images) + array("H", (level.images.index(LEDGE),))
+    assert not _reachable(level, player, (level.key[0], ledge_top), door_surface)
+    assert _reachable(level, player, key_surface, door_surface)
+
+
+def test_seeds_are_deterministic():
+    assert generate(11, WIDTH * 2).to_dict() == generate(11, WIDTH * 2).to_dict()
+    assert generate(11, WIDTH * 2).to_dict() != generate(12, WIDTH * 2).to_dict()
+    assert generate(11, WIDTH * 2, density=0.5).to_dict() != generate(11, WIDTH * 2).to_dict()
@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+
+from setorzero import levels
+
+
+def copy_level(tmp_path):
+    path = tmp_path / "level_1.json"
+    shutil.copy(levels.level_path(1), path)
+    return path, tmp_path / "__cache__" / "level_1.bin"
+
+
+def source(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_cache(path, cache_path, level):
+    cache_path.write_bytes(level.to_bytes(*source(path)))
+
+
+def test_fresh_cache_is_used(tmp_path):
+    path, cache_path = copy_level(tmp_path)
+    level = levels.load_file(str(path))
+    assert cache_path.exists()
+
+    # A cache that matches the source is trusted as is.
+    level.width = 4321.0
+    write_cache(path, cache_path, level)
+    assert levels.load_file(str(path)).width == 4321.0
+
+
+def test_cache_is_rebuilt_when_the_json_changes(tmp_path):
+    path, cache_path = copy_level(tmp_path)
+    before = levels.load_file(str(path))
+
+    data = json.loads(path.read_text())
+    data["coins"].append({"x": 12.0, "y": 34.0})
+    path.write_text(json.dumps(data))
+    stat = os.stat(path)
+    # Same size and timestamp would look unchanged; move the timestamp on.
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    after = levels.load_file(str(path))
+    assert len(after.coins) == len(before.coins) + 2
+    assert levels.LevelData.from_bytes(cache_path.read_bytes(), *source(path)).coins == after.coins
+
+
+def test_cache_is_rebuilt_when_its_version_changes(tmp_path, monkeypatch):
+    path, cache_path = copy_level(tmp_path)
+    level = levels.load_file(str(path))
+    level.width = 4321.0
+    write_cache(path, cache_path, level)
+
+    monkeypatch.setattr(levels, "CACHE_VERSION", levels.CACHE_VERSION + 1)
+    assert levels.load_file(str(path)).width != 4321.0
+    assert levels.LevelData.from_bytes(cache_path.read_bytes(), *source(path)) is not None
@@ -0,0 +1,42 @@
+import pytest
+
+from setorzero.entities import Enemy
+from setorzero.game import Game
+from setorzero.headless import HeadlessBackend
+
+
+@pytest.fixture
+def navigation():
+    game = Game(HeadlessBackend(), pursuit=True)
+    game.start_game()
+    return game.navigation
+
+
+def surface(navigation, left, top):
+    """The level 1 surface with its left end at `left` and its top at `top`."""
+    return next(surface for surface in navigation.surfaces if (round(surface.left), surface.top) == (left, top))
+
+
+def pursues(navigation, on, x, player_x):
+    enemy = Enemy(x, 0, x, x)
+    enemy.y_position = on.top - enemy.actor.height / 2
+    enemy.actor.pos = (enemy.x_position, enemy.y_position)
+    return navigation.pursues(enemy, player_x - x)
+
+
+def test_pursuit_follows_route_cost(navigation):
+    middle = surface(navigation, 216, 483)
+    navigation.target = middle
+    assert pursues(navigation, middle, 500, 800)
+    # Same floor, but further than the cost limit walks.
+    assert not pursues(navigation, middle, 300, 1000)
+    # A jump up from the floor below: cheap from near its take-off, too dear from the far end.
+    below = surface(navigation, 50, 613)
+    assert pursues(navigation, below, 200, 300)
+    assert not pursues(navigation, below, 700, 700)
+
+
+def test_no_pursuit_without_a_route(navigation):
+    # No walk, drop or jump in level 1 lands on the starting floor.
+    navigation.target = surface(navigation, 0, 736)
+    assert not pursues(navigation, surface(navigation, 576, 736), 600, 300)
@@ -0,0 +1,88 @@
+import socket
+import time
+
+import pytest
+
+from setorzero.benchmark import scripted_input
+from setorzero.game import Game
+from setorzero.headless import HeadlessBackend, step
+from setorzero.net import (EMPTY, HELLO, MAGIC, MAX_OUTBOX, PLAYER, VERSION, WELCOME, NetError, Server, WorldState,
+                           _HELLO, _LENGTH, _Connection, capture_state, coin_indexes, decode_delta, encode_delta)
+
+
+def round_trip(state, baseline):
+    data = encode_delta(state, baseline)
+    return decode_delta(data, 0, state.tick, baseline)
+
+
+def test_delta_round_trip_over_a_played_level():
+    game = Game(HeadlessBackend(), pursuit=True)
+    game.start_game()
+    coin_index = coin_indexes(game.world.level)
+    previous = EMPTY
+    for frame in range(600):
+        scripted_input(game.backend.keyboard, frame)
+        step(game, 1 / 60)
+        state = capture_state(game, frame + 1, coin_index)
+        assert round_trip(state, previous) == state
+        # Clients ack late, so deltas are also taken against older states.
+        assert round_trip(state, EMPTY) == state
+        previous = state
+
+
+def test_delta_round_trip_when_enemies_and_coins_come_and_go():
+    baseline = WorldState(1, (1, 1, 3, 40, 0, 0, 0, 0, 400, 800, 2, 0), ((10, 20, 0), (30, 40, 1)), 0b1011)
+    fewer = WorldState(2, (1, 1, 2, 40, 1, 1, 0, 0, 404, 796, 3, 1), ((10, 24, 1),), 0b0010)
+    more = WorldState(3, (1, 1, 3, 0, 0, 0, 0, 0, 400, 800, 0, 0), ((10, 20, 0), (30, 40, 1), (-5, 7, 2)), 0b1111)
+    for state, base in ((fewer, baseline), (more, fewer), (more, baseline), (baseline, baseline)):
+        assert round_trip(state, base) == state
+
+
+def test_delta_rejects_trailing_bytes():
+    state = WorldState(2, (1,) * len(EMPTY.fields), ((1, 2, 3),), 0b101)
+    data = encode_delta(state, EMPTY) + b"\x00"
+    with pytest.raises(NetError):
+        decode_delta(data, 0, 2, EMPTY)
+
+
+def hello_reply(role):
+    """What a server answers a hello for `role` with; b"" if it hangs up."""
+    server = Server(port=0, game=Game(HeadlessBackend()))
+    sock = socket.create_connection(server.address)
+    try:
+        body = _HELLO.pack(MAGIC, VERSION, role)
+        sock.sendall(_LENGTH.pack(len(body) + 1) + HELLO + body)
+        sock.setblocking(False)
+        deadline = time.perf_counter() + 5
+        while time.perf_counter() < deadline:
+            server.tick()
+            try:
+                return sock.recv(65536)
+            except BlockingIOError:
+                time.sleep(0.001)
+        raise TimeoutError
+    finally:
+        sock.close()
+        server.close()
+
+
+def test_unknown_roles_are_refused():
+    assert hello_reply(PLAYER)[_LENGTH.size:_LENGTH.size + 1] == WELCOME
+    assert hello_reply(7) == b""
+
+
+def test_peers_that_stop_reading_are_dropped():
+    listener = socket.create_server(("127.0.0.1", 0))
+    peer = socket.create_connection(listener.getsockname())
+    connection = _Connection(listener.accept()[0])
+    try:
+        body = bytes(65536)
+        for _ in range(4 * MAX_OUTBOX // len(body) + 1024):
+            connection.send(HELLO, body)
+            if connection.closed:
+                break
+        assert connection.closed
+    finally:
+        connection.close()
+        peer.close()
+        listener.close()
@@ -0,0 +1,47 @@
+from setorzero.benchmark import scripted_input
+from setorzero.game import Game
+from setorzero.generator import GeneratedLevels, level_loader
+from setorzero.headless import HeadlessBackend
+from setorzero.replay import Recorder, Recording, replay, state_hash
+
+
+def record(frames=600, events=None, **options):
+    game = Game(HeadlessBackend(), **options)
+    recorder = Recorder(game)
+    game.start_game()
+    for frame in range(frames):
+        if events and frame in events:
+            game.on_key_down(events[frame])
+        scripted_input(game.backend.keyboard, frame)
+        game.backend.clock.tick(1 / 60)
+        recorder.update(1 / 60)
+    # Replays read the file format, not the recorder's objects.
+    return Recording.from_bytes(recorder.recording.to_bytes()), state_hash(game)
+
+
+def replay_hash(recording):
+    game = Game(HeadlessBackend(), **recording.game_options())
+    result = replay(recording, game=game)
+    assert result.diverged_at is None
+    assert result.frames == len(recording.frames)
+    return state_hash(game)
+
+
+def test_replay_with_pursuit_on_a_generated_level():
+    recording, digest = record(pursuit=True, level_loader=level_loader(42, 2400))
+    assert isinstance(recording.game_options()["level_loader"], GeneratedLevels)
+    assert replay_hash(recording) == digest
+
+
+def test_replay_with_quick_save_and_load():
+    keys = HeadlessBackend().keys
+    recording, digest = record(events={100: keys.F5, 200: keys.F9}, pursuit=True)
+    assert len(recording.restores) == 1
+    assert replay_hash(recording) == digest
+
+
+def test_replay_reports_where_it_diverged():
+    recording, _ = record(frames=120)
+    mask, frame_time, digest = recording.frames[50]
+    recording.frames[50] = (mask, frame_time, bytes(len(digest)))
+    assert replay(recording).diverged_at == 50
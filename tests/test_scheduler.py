@@ -0,0 +1,43 @@
+import pytest
+
+from setorzero.game import Game
+from setorzero.generator import level_loader
+from setorzero.headless import HeadlessBackend
+from setorzero.scheduler import NEAR
+
+
+@pytest.fixture
+def game():
+    game = Game(HeadlessBackend(), ai_lod=True, level_loader=level_loader(5, 4000))
+    game.start_game()
+    game.update(1 / 60)
+    return game
+
+
+def tiers(game):
+    camera = game.camera
+    scheduler = game.ai_scheduler
+    return [scheduler.tier(enemy, game.player, camera.x, camera.x + camera.view_width)
+            for enemy in game.active_enemies]
+
+
+def test_capped_steps_keep_the_rest_banked(game):
+    enemy = next(enemy for enemy, tier in zip(game.active_enemies, tiers(game)) if tier != NEAR)
+    scheduler = game.ai_scheduler
+    enemy.tick_time = 0.35
+    scheduler.update([enemy], 1 / 60, game.player, game.platform_grid, game.camera)
+    assert enemy.tick_time == pytest.approx(0.35 + 1 / 60 - scheduler.max_step)
+
+
+def test_near_enemies_count_against_the_budget(game):
+    near = tiers(game).count(NEAR)
+    assert near and near < len(game.active_enemies)
+    scheduler = game.ai_scheduler
+    scheduler.budget = near
+    for enemy in game.active_enemies:
+        enemy.tick_time = 1.0
+    scheduler.full_ticks = scheduler.reduced_ticks = 0
+    scheduler.update(game.active_enemies, 1 / 60, game.player, game.platform_grid, game.camera)
+    # Near enemies always run; the rest still get one update.
+    assert scheduler.full_ticks == near
+    assert scheduler.reduced_ticks == 1
@@ -0,0 +1,38 @@
+from setorzero import snapshot
+from setorzero.benchmark import scripted_input
+from setorzero.game import Game
+from setorzero.generator import level_loader
+from setorzero.headless import HeadlessBackend, step
+from setorzero.replay import state_hash
+
+
+def play(game, frames, first=0):
+    for frame in range(first, first + frames):
+        scripted_input(game.backend.keyboard, frame)
+        step(game, 1 / 60)
+
+
+def test_restore_returns_to_the_captured_state():
+    game = Game(HeadlessBackend())
+    game.start_game()
+    play(game, 300)
+    data = snapshot.capture(game)
+    digest = state_hash(game)
+
+    play(game, 120, 300)
+    assert state_hash(game) != digest
+    snapshot.restore(game, data)
+    assert state_hash(game) == digest
+
+
+def test_restore_across_streamed_chunks_plays_on_the_same():
+    game = Game(HeadlessBackend(), pursuit=True, level_loader=level_loader(42, 2400))
+    game.start_game()
+    play(game, 300)
+    data = snapshot.capture(game)
+    play(game, 600, 300)
+    expected = state_hash(game)
+
+    snapshot.restore(game, data)
+    play(game, 600, 300)
+    assert state_hash(game) == expected
@@ -0,0 +1,44 @@
+import random
+
+from pgzero.rect import ZRect
+
+from setorzero.entities import overlaps
+from setorzero.spatial import SpatialGrid
+
+
+def random_rect(rng):
+    return ZRect(rng.uniform(-300, 1500), rng.uniform(-300, 900), rng.uniform(1, 300), rng.uniform(1, 80))
+
+
+def test_query_finds_what_a_full_scan_finds_in_the_same_order():
+    rng = random.Random(2)
+    items = [random_rect(rng) for _ in range(300)]
+    grid = SpatialGrid(64)
+    for item in items:
+        grid.insert(item, item)
+    removed = set(map(id, rng.sample(items, 60)))
+    for item in items:
+        if id(item) in removed:
+            grid.remove(item)
+    items = [item for item in items if id(item) not in removed]
+
+    for _ in range(500):
+        rect = random_rect(rng)
+        extend_down = rng.choice((0, 0, rng.uniform(0, 200)))
+        reach = ZRect(rect.x, rect.y, rect.w, rect.h + extend_down)
+        found = list(grid.query(rect, extend_down))
+        assert len(set(map(id, found))) == len(found)
+        assert [item for item in found if overlaps(reach, item)] == [item for item in items if overlaps(reach, item)]
+        # Candidates keep insertion order, so collisions resolve as a full loop would.
+        order = {id(item): index for index, item in enumerate(items)}
+        assert [order[id(item)] for item in found] == sorted(order[id(item)] for item in found)
+
+
+def test_items_on_cell_edges_are_found():
+    grid = SpatialGrid(64)
+    edge = ZRect(64, 64, 64, 64)
+    grid.insert(edge, edge)
+    assert grid.query(ZRect(63, 63, 2, 2)) == [edge]
+    assert grid.query(ZRect(127, 127, 1, 1)) == [edge]
+    assert grid.query(ZRect(60, 0, 10, 10), extend_down=60) == [edge]
+    assert grid.query(ZRect(60, 0, 10, 10)) == []